@@ -1,246 +1,131 @@
 import os
-import re
-import datetime
-import requests
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables before moodx reads its settings
 load_dotenv()
 
+from moodx.categories import enabled_sections  # noqa: E402
+from moodx.config import (  # noqa: E402
+    AGENT_CONCURRENCY,
+    AGENT_MODE,
+    AGENT_PREFETCH,
+    AGENT_REQUEST_MODE,
+    METRICS_PORT,
+    MODEL_NAME,
+)
+from moodx.metrics import Trace, metrics, serve  # noqa: E402
+from moodx.pipeline import (  # noqa: E402
+    agent_names,
+    generate_agent_recommendation,
+    generate_agent_recommendations,
+    generate_agent_recommendations_batched,
+    generate_page,
+)
+from moodx.ui import (  # noqa: E402
+    fill_agent_tab,
+    fill_section_tab,
+    get_catalog,
+    get_llm,
+    get_result_cache,
+    layout_agent_tabs,
+    layout_section_tabs,
+    setup_page,
+    show_mood,
+    tab_names,
+)
+
 # API configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-MODEL_NAME = "llama3-70b-8192"
 
 if not GROQ_API_KEY:
     st.error("❌ GROQ_API_KEY not found in .env file")
     st.stop()
 
-# Groq API Client
-class ChatGroq:
-    def __init__(self, api_key, model_name):
-        self.api_key = api_key
-        self.model = model_name
-        self.endpoint = "https://api.groq.com/openai/v1/chat/completions"
-
-    def generate(self, prompt, max_tokens=6000):
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-            "max_tokens": max_tokens
-        }
-        response = requests.post(self.endpoint, headers=headers, json=payload)
-        if response.status_code == 200:
-            return response.json()["choices"][0]["message"]["content"]
-        raise Exception(f"API Error: {response.status_code} - {response.text}")
-
-# Initialize Groq client
-llm = ChatGroq(GROQ_API_KEY, MODEL_NAME)
-
-# Context and mood analysis
-def get_context():
-    return {
-        "time": datetime.datetime.now().strftime("%H:%M"),
-        "device": "mobile",
-        "location": "home"
-    }
+# Shared client and result cache for every session in this process
+llm = get_llm(GROQ_API_KEY, MODEL_NAME)
+result_cache = get_result_cache()
+catalog = get_catalog()
 
-def analyze_mood(text):
-    prompt = f"Analyze the mood from this text in one short sentence:\n{text}"
-    return llm.generate(prompt, 150)
-
-# Recommendation generation with updated instructions for valid URLs.
-def generate_recommendations(context, mood, preferences):
-    prompt = f"""
-Generate recommendations based on the following details:
-- Mood: {mood}
-- Context: {context}
-- Preferences: {preferences}
-
-For each of the categories listed below, please provide exactly 10 recommendations in the format shown. If a valid URL is not available for any recommendation, output "N/A" for the URL field.
-
-🎥 Videos:
-1. [Video Title] - [YouTube URL]
-2. [Video Title] - [YouTube URL]
-...
-10. [Video Title] - [YouTube URL]
-
-🎬 Movies:
-1. [Movie Title] - [Streaming Service] - [Trending/Popularity/Rating Details] - [URL]
-2. [Movie Title] - [Streaming Service] - [Trending/Popularity/Rating Details] - [URL]
-...
-10. [Movie Title] - [Streaming Service] - [Trending/Popularity/Rating Details] - [URL]
-
-🎵 Songs:
-1. [Song Title] - [Artist] - [URL]
-2. [Song Title] - [Artist] - [URL]
-...
-10. [Song Title] - [Artist] - [URL]
-
-🛍️ Products:
-1. [Product/App Name] - [URL] - [Reason]
-2. [Product/App Name] - [URL] - [Reason]
-...
-10. [Product/App Name] - [URL] - [Reason]
-
-🎮 Games:
-1. [Game Title] - [Platform]
-2. [Game Title] - [Platform]
-...
-10. [Game Title] - [Platform]
-
-📖 Articles:
-1. [Article Title] - [URL]
-2. [Article Title] - [URL]
-...
-10. [Article Title] - [URL]
-
-💞 Connect:
-1. [Social/Dating Idea] - [URL]
-2. [Social/Dating Idea] - [URL]
-...
-10. [Social/Dating Idea] - [URL]
-
-✈️ Travel:
-1. [Destination] - [URL]
-2. [Destination] - [URL]
-...
-10. [Destination] - [URL]
-
-🍽️ Food:
-1. [Meal Idea] - [URL]
-2. [Meal Idea] - [URL]
-...
-10. [Meal Idea] - [URL]
-
-🍿 Cine Magic:
-1. [Movie/Show Title] - [Streaming Service] - [URL]
-2. [Movie/Show Title] - [Streaming Service] - [URL]
-...
-10. [Movie/Show Title] - [Streaming Service] - [URL]
-"""
-    return llm.generate(prompt, 6000)
-
-# New function to generate recommendations for additional agents based on mood and context.
-def generate_agent_recommendation(agent_name, mood, context):
-    prompt = f"Based on the current mood '{mood}' and context {context}, provide a concise recommendation for enhancing the user's day using the '{agent_name}'. Include one actionable suggestion if possible."
-    try:
-        return llm.generate(prompt, 500)
-    except Exception as e:
-        return f"Error generating recommendation: {str(e)}"
-
-# Streamlit UI configuration with a futuristic, dark theme
-st.set_page_config(page_title="MoodX Machina", layout="wide")
-
-st.markdown("""
-<style>
-/* Global futuristic style */
-body {
-    background-color: #000000 !important;
-}
-[data-testid="stAppViewContainer"] {
-    background-color: #000000;
-}
-/* Custom glowing fonts and UI */
-@import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@500&display=swap');
-html, body, * {
-    font-family: 'Orbitron', sans-serif;
-    color: #f0f0f0;
-}
-/* Animated glowing title */
-.glow-title {
-    font-size: 2.5em;
-    text-align: left;
-    animation: glow 2s ease-in-out infinite alternate;
-    color: #f72585;
-    text-shadow: 0 0 5px #f72585, 0 0 10px #7209b7, 0 0 20px #3a0ca3;
-}
-@keyframes glow {
-    from {
-        text-shadow: 0 0 5px #f72585, 0 0 10px #7209b7, 0 0 20px #3a0ca3;
-    }
-    to {
-        text-shadow: 0 0 10px #f72585, 0 0 20px #7209b7, 0 0 30px #3a0ca3;
-    }
-}
-/* Glowing module section */
-.section {
-    padding: 25px;
-    border-radius: 15px;
-    margin: 20px 0;
-    background: #111111;
-    border: 1px solid #7209b7;
-    box-shadow: 0 0 15px #f72585, 0 0 20px #7209b7 inset;
-}
-/* Glowing headers */
-.header {
-    color: #f72585;
-    font-size: 1.6em;
-    margin-bottom: 15px;
-    text-shadow: 0 0 5px #f72585, 0 0 10px #7209b7;
-}
-/* Neon glowing item blocks */
-.item {
-    margin: 15px 0;
-    padding: 15px;
-    border-left: 4px solid #7209b7;
-    background: rgba(255, 255, 255, 0.05);
-    box-shadow: 0 0 8px #3a0ca3;
-    transition: transform 0.2s;
-}
-.item:hover {
-    transform: scale(1.03);
-    box-shadow: 0 0 12px #f72585;
-}
-/* Tabs styling */
-[data-testid="stTabs"] button {
-    background-color: #111111;
-    color: #f0f0f0;
-    border: none;
-    border-radius: 0;
-    border-bottom: 3px solid #7209b7;
-    transition: all 0.3s ease;
-}
-[data-testid="stTabs"] button:hover {
-    color: #f72585;
-    border-bottom: 3px solid #f72585;
-    box-shadow: 0 0 5px #f72585;
-}
-[data-testid="stTabs"] button[data-selected="true"] {
-    background-color: #1a1a1a;
-    border-bottom: 3px solid #f72585;
-    box-shadow: 0 0 10px #f72585;
-}
-/* Input text area glow */
-textarea {
-    background-color: #0d0d0d !important;
-    color: #f0f0f0 !important;
-    border: 1px solid #f72585 !important;
-    box-shadow: 0 0 5px #f72585 inset !important;
-}
-/* Button styling */
-button[kind="primary"] {
-    background-color: #f72585;
-    color: white;
-    box-shadow: 0 0 10px #f72585;
-}
-button[kind="primary"]:hover {
-    background-color: #7209b7;
-    box-shadow: 0 0 15px #7209b7;
-}
-/* Image styling */
-.stImage > img {
-    border: 2px solid #f72585;
-    border-radius: 10px;
-    box-shadow: 0 0 10px #f72585;
-}
-</style>
-""", unsafe_allow_html=True)
+# Prometheus /metrics and /stats.json endpoint, started once per process
+@st.cache_resource
+def start_metrics_server(port):
+    return serve(port)
+
+if METRICS_PORT:
+    start_metrics_server(METRICS_PORT)
+
+# Process-wide count of how often each agent is asked for in lazy mode, used to pick prefetches
+@st.cache_resource
+def get_agent_popularity():
+    return {"lock": threading.Lock(), "counts": Counter()}
+
+# Background pool for agent prefetches; they outlive the script run that started them
+@st.cache_resource
+def get_prefetch_executor():
+    return ThreadPoolExecutor(max_workers=AGENT_CONCURRENCY)
+
+def most_popular_agents(agent_names, count):
+    popularity = get_agent_popularity()
+    with popularity["lock"]:
+        ranked = [agent for agent, _ in popularity["counts"].most_common() if agent in agent_names]
+    return (ranked + [agent for agent in agent_names if agent not in ranked])[:count]
+
+def record_agent_request(agent):
+    popularity = get_agent_popularity()
+    with popularity["lock"]:
+        popularity["counts"][agent] += 1
+
+setup_page()
+
+# Agent request strategy, switchable at runtime to compare latency and token cost
+agent_request_mode = st.sidebar.radio("Agent requests", ["per-agent", "batched"],
+                                      index=1 if AGENT_REQUEST_MODE == "batched" else 0)
+
+# Connection-reuse counters for the shared transport
+with st.sidebar.expander("⚙️ Transport stats"):
+    st.json(llm.transport.stats())
+
+# Queueing and 429 counters for the shared rate limiter
+with st.sidebar.expander("🚦 Rate limiter"):
+    st.json(llm.limiter.stats())
+
+# Upstream calls saved by sharing in-flight identical requests
+with st.sidebar.expander("🔗 Request coalescing"):
+    st.json(llm.singleflight.stats())
+
+# Completion-token usage and current adaptive caps per call type
+with st.sidebar.expander("🎚️ Token budgets"):
+    st.json(llm.budget.stats())
+
+# Duplicate requests sent for slow calls, and how often the duplicate answered first
+if llm.hedge.call_types:
+    with st.sidebar.expander("🪃 Hedged requests"):
+        st.json(llm.hedge.stats())
+
+# Calls, latency, tokens, estimated cost and fallbacks per model tier
+if llm.router:
+    with st.sidebar.expander("🧭 Model routing"):
+        st.json(llm.router.stats())
+
+# Hit/miss counters for the shared result cache
+with st.sidebar.expander("🗃️ Cache stats"):
+    st.json(result_cache.stats())
+
+# Size of the local catalog and how many tabs it served instead of the model
+if catalog is not None:
+    with st.sidebar.expander("📚 Catalog"):
+        st.json(catalog.stats())
+
+# Stage timings, per-call latency and token totals, and errors since the process started
+with st.sidebar.expander("📈 Pipeline metrics"):
+    st.json(metrics.snapshot())
+    st.download_button("Prometheus text", metrics.prometheus(), "moodx_metrics.txt")
+show_trace = st.sidebar.checkbox("Show request trace", False)
 
 # Create a two-column layout
 col1, col2 = st.columns([1, 2])
@@ -276,233 +161,136 @@ with st.container():
         st.markdown("</div>", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
+# Lazy mode: each agent tab offers a button instead of a pre-generated answer. Answers are
+# memoized in the session's results, and prefetched ones are picked up from their futures.
+def prefetch_agents(results):
+    executor = get_prefetch_executor()
+    st.session_state["agent_prefetch"] = {
+        agent: executor.submit(generate_agent_recommendation, llm, agent, results["mood"], results["context"])
+        for agent in most_popular_agents(agent_names, AGENT_PREFETCH)
+    }
+
+def render_lazy_agent_tabs(results):
+    st.markdown("<hr>", unsafe_allow_html=True)
+    st.markdown("<div class='glow-title'>🤖 Additional Agent Suggestions</div>", unsafe_allow_html=True)
+    agent_tabs = st.tabs(agent_names)
+    for i, agent in enumerate(agent_names):
+        with agent_tabs[i]:
+            st.markdown(f"<div class='section'><div class='header'>{agent}</div></div>", unsafe_allow_html=True)
+            if agent not in results["agents"] and st.button(f"✨ Ask the {agent}", key=f"agent_{agent}"):
+                record_agent_request(agent)
+                future = st.session_state.get("agent_prefetch", {}).pop(agent, None)
+                with st.spinner(f"Asking the {agent}..."):
+                    results["agents"][agent] = (future.result() if future is not None else
+                                                generate_agent_recommendation(llm, agent, results["mood"], results["context"]))
+            if agent in results["agents"]:
+                st.markdown(f"<div style='font-size:1.1em;'>{results['agents'][agent]}</div>", unsafe_allow_html=True)
+
+# Stage spans of the request that produced the results
+def render_trace(results):
+    if show_trace and results.get("trace"):
+        st.caption("Request trace (seconds)")
+        st.table(results["trace"])
+
+# Re-renders a finished result from st.session_state without any LLM calls
+def render_stored_results(results):
+    show_mood(st.empty(), results["mood"])
+    # Same tabs as when the results were generated
+    shown_sections = enabled_sections(results["inputs"])
+    placeholders = layout_section_tabs(shown_sections)
+    for sec in shown_sections:
+        fill_section_tab(placeholders, sec, results["sections"].get(sec, []))
+    st.success("Recommendations generated successfully, Captain!")
+    render_trace(results)
+    if AGENT_MODE == "lazy":
+        render_lazy_agent_tabs(results)
+        return
+    agent_placeholders = layout_agent_tabs()
+    for agent in agent_names:
+        fill_agent_tab(agent_placeholders, agent, results["agents"].get(agent, ""))
+
+# Results of the last generation live in the session, so reruns triggered by other widgets
+# redraw them instead of throwing them away, and nothing is regenerated unless the inputs change
+inputs = {"user_input": user_input, "language": lang, "include_products": include_products}
+stored_results = st.session_state.get("results")
+
 # Button to generate recommendations (centered)
 st.markdown("<div style='text-align: center; margin: 20px;'>", unsafe_allow_html=True)
-if st.button("Generate Recommendations"):
+generate_clicked = st.button("Generate Recommendations")
+if stored_results is not None and (not generate_clicked or stored_results["inputs"] == inputs):
+    if stored_results["inputs"] != inputs:
+        st.info("Showing results for your previous inputs. Press Generate Recommendations to refresh them.")
+    render_stored_results(stored_results)
+elif generate_clicked:
     with st.spinner("Analyzing mood and generating recommendations..."):
-        # Get context and mood
-        context = get_context()
-        mood = analyze_mood(user_input)
-        
-        # Generate recommendations using updated max_tokens and updated prompt format
+        trace = Trace()
+        mood_placeholder = st.empty()
         preferences = {"language": lang, "include_products": include_products}
-        recommendations = generate_recommendations(context, mood, preferences)
-        
-        # Debug: Uncomment the next two lines if you need to check the raw output
-        # st.write("Raw Recommendations Output:")
-        # st.text(recommendations)
+        # Tabs are laid out up front so each one can be filled as soon as its section is ready
+        requested_sections = enabled_sections(preferences)
+        tab_placeholders = layout_section_tabs(requested_sections)
+        # Rendering interleaves with the pipeline's network reads, so its time is summed up
+        # separately and reported as a stage of its own
+        render_started = time.perf_counter()
+        render_seconds = 0.0
+        page = None
+        for kind, value in generate_page(llm, result_cache, user_input, preferences, catalog=catalog, trace=trace):
+            if kind == "mood":
+                show_mood(mood_placeholder, value)
+            elif kind == "section":
+                section_started = time.perf_counter()
+                fill_section_tab(tab_placeholders, *value)
+                render_seconds += time.perf_counter() - section_started
+            elif kind == "error":
+                section, error = value
+                st.warning(f"{tab_names[section]}: {error}")
+            else:
+                page = value
+        metrics.record_stage("render", render_started, render_seconds, trace)
+        mood, context, sections = page["mood"], page["context"], page["sections"]
         
-        # Parse recommendations into sections for the main categories
-        sections = {}
-        current_section = None
-        valid_sections = ["🎥 Videos", "🎬 Movies", "🎵 Songs", "🛍️ Products",
-                          "🎮 Games", "📖 Articles", "💞 Connect", "✈️ Travel",
-                          "🍽️ Food", "🍿 Cine Magic"]
-        for line in recommendations.split('\n'):
-            line = line.strip()
-            if any(line.startswith(section) for section in valid_sections):
-                current_section = line.split(':', 1)[0].strip()
-                sections[current_section] = []
-            elif current_section and line:
-                sections[current_section].append(line)
+        # Categories the model skipped still get their (empty) tab
+        for sec in requested_sections:
+            if sec not in sections:
+                fill_section_tab(tab_placeholders, sec, [])
         st.markdown("</div>", unsafe_allow_html=True)
         
-        # Define tab names and ordering; "Cine Magic" comes first
-        tab_names = {
-            "🍿 Cine Magic": "🍿 Cine Magic",
-            "🎵 Songs": "🎵 Jam Sessions",
-            "🛍️ Products": "🛒 Hot Buys",
-            "🎮 Games": "🎮 Game On",
-            "📖 Articles": "📚 Thoughtful Reads",
-            "🎥 Videos": "📹 Video Vibes",
-            "💞 Connect": "💞 Social Sparks",
-            "✈️ Travel": "✈️ Wanderlust Escapes",
-            "🍽️ Food": "🍽️ Mood Meals"
-        }
-        ordered_sections = ["🍿 Cine Magic", "🎵 Songs", "🛍️ Products", "🎮 Games",
-                            "📖 Articles", "🎥 Videos", "💞 Connect", "✈️ Travel",
-                            "🍽️ Food"]
-        tabs = st.tabs([tab_names[sec] for sec in ordered_sections])
-        
-        # Helper function to handle URL check and fallback messaging.
-        def get_valid_url(url):
-            if url.strip().lower() in ["n/a", "not available"]:
-                return None
-            return url.strip()
-        
-        # Populate each tab with the corresponding recommendations
-        with tabs[0]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>🍿 Cine Magic</div>", unsafe_allow_html=True)
-            for line in sections.get("🍿 Cine Magic", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+?)\s*-\s*(.+)', line):
-                    title = match.group(1).strip()
-                    service = match.group(2).strip()
-                    url = get_valid_url(match.group(3))
-                    url_html = f'<a href="{url}" target="_blank">Watch Now</a>' if url else "Link Coming Soon"
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{title}</b><br>
-                        <em>{service}</em><br>
-                        {url_html}
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[1]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>🎵 Jam Sessions</div>", unsafe_allow_html=True)
-            for line in sections.get("🎵 Songs", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+?)\s*-\s*(.+)', line):
-                    title = match.group(1).strip()
-                    artist = match.group(2).strip()
-                    url = get_valid_url(match.group(3))
-                    url_html = f'<a href="{url}" target="_blank">Listen Now</a>' if url else "Link Coming Soon"
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{title}</b> by {artist}<br>
-                        {url_html}
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[2]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>🛒 Hot Buys</div>", unsafe_allow_html=True)
-            for line in sections.get("🛍️ Products", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+?)\s*-\s*(.+)', line):
-                    product = match.group(1).strip()
-                    url = get_valid_url(match.group(2))
-                    reason = match.group(3).strip()
-                    url_html = f'<a href="{url}" target="_blank">View Product</a>' if url else "Link Coming Soon"
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{product}</b><br>
-                        {reason}<br>
-                        {url_html}
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[3]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>🎮 Game On</div>", unsafe_allow_html=True)
-            for line in sections.get("🎮 Games", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+)', line):
-                    game = match.group(1).strip()
-                    platform = match.group(2).strip()
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{game}</b><br>
-                        <em>Platform: {platform}</em>
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[4]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>📚 Thoughtful Reads</div>", unsafe_allow_html=True)
-            for line in sections.get("📖 Articles", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+)', line):
-                    title = match.group(1).strip()
-                    url = get_valid_url(match.group(2))
-                    url_html = f'<a href="{url}" target="_blank">Read More</a>' if url else "Link Coming Soon"
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{title}</b><br>
-                        {url_html}
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[5]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>📹 Video Vibes</div>", unsafe_allow_html=True)
-            for line in sections.get("🎥 Videos", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+)', line):
-                    title = match.group(1).strip()
-                    url = get_valid_url(match.group(2))
-                    url_html = f'<a href="{url}" target="_blank">Watch Now</a>' if url else "Link Coming Soon"
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{title}</b><br>
-                        {url_html}
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[6]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>💞 Social Sparks</div>", unsafe_allow_html=True)
-            for line in sections.get("💞 Connect", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+)', line):
-                    idea = match.group(1).strip()
-                    url = get_valid_url(match.group(2))
-                    url_html = f'<a href="{url}" target="_blank">Explore</a>' if url else "Link Coming Soon"
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{idea}</b><br>
-                        {url_html}
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[7]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>✈️ Wanderlust Escapes</div>", unsafe_allow_html=True)
-            for line in sections.get("✈️ Travel", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+)', line):
-                    destination = match.group(1).strip()
-                    url = get_valid_url(match.group(2))
-                    url_html = f'<a href="{url}" target="_blank">Discover</a>' if url else "Link Coming Soon"
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{destination}</b><br>
-                        {url_html}
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        with tabs[8]:
-            st.markdown("<div class='section'>", unsafe_allow_html=True)
-            st.markdown("<div class='header'>🍽️ Mood Meals</div>", unsafe_allow_html=True)
-            for line in sections.get("🍽️ Food", []):
-                if match := re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+)', line):
-                    meal = match.group(1).strip()
-                    url = get_valid_url(match.group(2))
-                    url_html = f'<a href="{url}" target="_blank">Explore Recipe</a>' if url else "Link Coming Soon"
-                    st.markdown(f"""
-                    <div class="item">
-                        <b>{meal}</b><br>
-                        {url_html}
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-            
         st.success("Recommendations generated successfully, Captain!")
         
-        # =======================================================
-        # Additional Agent Recommendations Section
-        # These extra agents now use dynamic prompting to generate
-        # mood-relevant, actionable suggestions.
-        # =======================================================
-        st.markdown("<hr>", unsafe_allow_html=True)
-        st.markdown("<div class='glow-title'>🤖 Additional Agent Suggestions</div>", unsafe_allow_html=True)
-        
-        agent_names = [
-            "Daily Planner",
-            "Mental Health Copilot",
-            "Social Media Curator",
-            "Budget-Friendly Recommender",
-            "Feedback Learning Agent",
-            "Geo-aware Recommender",
-            "Goal Alignment Agent",
-            "Sentiment Enhancer"
-        ]
-        
-        agent_tabs = st.tabs(agent_names)
-        for i, agent in enumerate(agent_names):
-            with agent_tabs[i]:
-                st.markdown(f"<div class='section'><div class='header'>{agent}</div></div>", unsafe_allow_html=True)
-                recommendation_text = generate_agent_recommendation(agent, mood, context)
-                st.markdown(f"<div style='font-size:1.1em;'>{recommendation_text}</div>", unsafe_allow_html=True)
+        results = {
+            "inputs": inputs,
+            "mood": mood,
+            "context": context,
+            "sections": sections,
+            "agents": {},
+        }
+        if AGENT_MODE == "lazy":
+            metrics.record_stage("page", trace.started, time.perf_counter() - trace.started, trace)
+            results["trace"] = trace.rows()
+            render_trace(results)
+            # Stored before the tabs are drawn: asking an agent reruns the script from session state
+            st.session_state["results"] = results
+            prefetch_agents(results)
+            render_lazy_agent_tabs(results)
+        else:
+            agent_placeholders = layout_agent_tabs()
+            
+            # Per-agent: all agents run concurrently and each tab is filled as its result arrives.
+            # Batched: one request answers for every agent.
+            agents_started = time.perf_counter()
+            with metrics.stage("agents", trace):
+                if agent_request_mode == "batched":
+                    agent_results = generate_agent_recommendations_batched(llm, agent_names, mood, context)
+                else:
+                    agent_results = generate_agent_recommendations(llm, agent_names, mood, context)
+                for agent, recommendation_text in agent_results:
+                    # Time until this agent's answer arrived, measured from the fan-out
+                    trace.add(f"agent: {agent}", agents_started, time.perf_counter() - agents_started)
+                    results["agents"][agent] = recommendation_text
+                    fill_agent_tab(agent_placeholders, agent, recommendation_text)
+            st.caption(f"Agent suggestions ({agent_request_mode}) took {time.perf_counter() - agents_started:.2f}s")
+            metrics.record_stage("page", trace.started, time.perf_counter() - trace.started, trace)
+            results["trace"] = trace.rows()
+            render_trace(results)
+            st.session_state["results"] = results
+
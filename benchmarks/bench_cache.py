@@ -0,0 +1,82 @@
+# Result cache hit rate across replicas, per-process memory versus a shared backend.
+#
+#   python benchmarks/bench_cache.py [--requests 5000] [--texts 2000] [--replicas 1 2 4 8]
+#
+# Replays one Zipf-distributed stream of mood texts spread at random over N replicas, each with
+# its own ResultCache as each Streamlit process has. A replica that misses "generates" the mood
+# and sections (the recorded completion) and stores them. With memory-only caches every replica
+# has to see a text itself before it hits; with a shared SQLite file (WAL) or a Redis (the
+# in-process benchmarks/mock_redis.py) the hit rate follows total traffic. Also reports the mean
+# get_many() + set_many() time per request and the encoded size of a page of sections.
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mock_redis import start_server  # noqa: E402
+from moodx.cache import ResultCache, SQLiteBackend, RedisBackend, encode_value, make_cache_key  # noqa: E402
+from moodx.parser import parse_sections  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "recommendations.md")
+
+CONTEXT = {"time": "18:30", "device": "mobile", "location": "home"}
+PREFERENCES = {"language": "English", "include_products": True}
+
+def zipf_stream(texts, requests, s, seed):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** s for rank in range(texts)]
+    return rng.choices(range(texts), weights, k=requests)
+
+def run(name, make_backend, stream, replicas, maxsize, sections, seed):
+    caches = [ResultCache(maxsize=maxsize, backend=make_backend()) for _ in range(replicas)]
+    rng = random.Random(seed)
+    hits = 0
+    started = time.perf_counter()
+    for text_id in stream:
+        cache = caches[rng.randrange(replicas)]
+        text = f"I'm feeling mood number {text_id} today"
+        mood_key = make_cache_key("mood", text)
+        key = make_cache_key("recommendations", text, PREFERENCES, CONTEXT)
+        found = cache.get_many([mood_key, key])
+        if key in found:
+            hits += 1
+        else:
+            cache.set_many({mood_key: f"Mood {text_id}", key: sections})
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<8} {replicas:3d} replicas  hit rate {hits / len(stream):6.1%}  "
+          f"{elapsed / len(stream) * 1e6:8.1f} us/request")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Result cache hit rate across replicas")
+    arg_parser.add_argument("--requests", type=int, default=5000, help="requests replayed per run")
+    arg_parser.add_argument("--texts", type=int, default=2000, help="distinct mood texts")
+    arg_parser.add_argument("--zipf", type=float, default=1.0, help="Zipf exponent of text popularity")
+    arg_parser.add_argument("--replicas", type=int, nargs="+", default=[1, 2, 4, 8])
+    arg_parser.add_argument("--maxsize", type=int, default=512, help="memory entries per replica")
+    arg_parser.add_argument("--redis-latency-ms", type=float, default=0.0, help="round trip of the mock Redis")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    with open(DATA_PATH, encoding="utf-8") as f:
+        sections = parse_sections(f.read())
+    print(f"page of sections: {len(encode_value(sections)):,} bytes encoded")
+
+    server, _ = start_server(argparse.Namespace(latency_ms=args.redis_latency_ms))
+    redis_url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+    stream = zipf_stream(args.texts, args.requests, args.zipf, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        for replicas in args.replicas:
+            db_path = os.path.join(tmp, f"cache-{replicas}.db")
+            redis_prefix = f"bench{replicas}:"
+            run("memory", lambda: None, stream, replicas, args.maxsize, sections, args.seed)
+            run("sqlite", lambda: SQLiteBackend(db_path), stream, replicas, args.maxsize, sections, args.seed)
+            run("redis", lambda: RedisBackend(redis_url, prefix=redis_prefix), stream, replicas, args.maxsize,
+                sections, args.seed)
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Local catalog: indexing cost per generated page and lookup latency for a full tab set.
+#
+#   python benchmarks/bench_catalog.py [--pages 2000] [--distinct 40] [--lookups 2000]
+#
+# Fills a fresh catalog with --pages simulated past results: the recorded completion in
+# benchmarks/data/ under a random mood sentence and language, each item renamed to one of
+# --distinct variants so evergreen titles recur across pages like they do in real traffic. Then
+# times Catalog.lookup() for the enabled categories under random moods, reporting p50/p95 and
+# how many tabs it could serve. Compare with the seconds a recommendations completion takes.
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.catalog import Catalog  # noqa: E402
+from moodx.categories import enabled_sections  # noqa: E402
+from moodx.parser import parse_sections  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "recommendations.md")
+
+MOODS = [
+    "You sound excited and ready for new adventures.",
+    "You seem calm and relaxed this evening.",
+    "You feel a bit sad and lonely today.",
+    "You sound stressed and tired after a busy week.",
+    "You seem curious and motivated to learn something.",
+    "You feel nostalgic and grateful.",
+    "You sound bored and restless.",
+    "You feel romantic and happy.",
+]
+LANGUAGES = ["English", "Hindi", "Spanish", "Mandarin"]
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Local catalog indexing and lookup cost")
+    arg_parser.add_argument("--pages", type=int, default=2000, help="past results indexed")
+    arg_parser.add_argument("--distinct", type=int, default=40, help="variants per recorded item")
+    arg_parser.add_argument("--lookups", type=int, default=2000, help="lookups timed")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with open(DATA_PATH, encoding="utf-8") as f:
+        recorded = parse_sections(f.read())
+    requested = enabled_sections()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = Catalog(os.path.join(tmp, "catalog.db"))
+        add_times = []
+        for _ in range(args.pages):
+            sections = {
+                section: [item._replace(title=f"{item.title} #{rng.randrange(args.distinct)}") for item in items]
+                for section, items in recorded.items()
+            }
+            started = time.perf_counter()
+            catalog.add(sections, rng.choice(LANGUAGES), rng.choice(MOODS))
+            add_times.append(time.perf_counter() - started)
+
+        lookup_times = []
+        served = 0
+        for _ in range(args.lookups):
+            started = time.perf_counter()
+            found = catalog.lookup(rng.choice(MOODS), rng.choice(LANGUAGES), requested)
+            lookup_times.append(time.perf_counter() - started)
+            served += len(found)
+
+        stats = catalog.stats()
+        print(f"catalog: {stats['items']:,} items, {stats['index_entries']:,} index entries, "
+              f"{os.path.getsize(os.path.join(tmp, 'catalog.db')) / 1e6:.1f} MB")
+        print(f"add page:     p50 {percentile(add_times, 0.5) * 1000:7.2f} ms  "
+              f"p95 {percentile(add_times, 0.95) * 1000:7.2f} ms")
+        print(f"lookup page:  p50 {percentile(lookup_times, 0.5) * 1000:7.2f} ms  "
+              f"p95 {percentile(lookup_times, 0.95) * 1000:7.2f} ms")
+        print(f"tabs served per lookup: {served / args.lookups:.1f} of {len(requested)} "
+              f"(the rest are categories the catalog does not keep)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Cold import time of the moodx entry points.
+#
+#   python benchmarks/bench_import.py [--rounds 5]
+#
+# Each statement runs in a fresh interpreter; the time of an empty interpreter is subtracted,
+# so the numbers are what a worker or script pays for its imports before doing any work.
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+STATEMENTS = [
+    ("moodx", "import moodx"),
+    ("moodx.parser", "import moodx.parser"),
+    ("moodx.pipeline", "import moodx.pipeline"),
+    ("client + call", "import moodx; moodx.create_client('key').transport"),
+    ("moodx.ui", "import moodx.ui"),
+]
+
+def run(statement, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Cold import time of the moodx entry points")
+    arg_parser.add_argument("--rounds", type=int, default=5, help="fresh interpreters per statement; the best is reported")
+    args = arg_parser.parse_args()
+
+    baseline = run("pass", args.rounds)
+    print(f"  {'interpreter':<16} {baseline * 1000:8.1f} ms")
+    for name, statement in STATEMENTS:
+        print(f"  {name:<16} {(run(statement, args.rounds) - baseline) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Parser micro-benchmark over recorded recommendation completions.
+#
+#   python benchmarks/bench_parser.py [--repeat 200] [--chunk-size 24] [files ...]
+#
+# Each recorded completion is concatenated --repeat times into one large reply and parsed
+# three ways: the legacy inline scrape the UI used to run, the single-pass parser on the
+# whole text, and the same parser fed in SSE-sized chunks as the streaming path does.
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.parser import SectionStreamParser, valid_sections  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# The section scrape plus per-tab regex the Streamlit script used before the parser module.
+# Blocks are kept in a list rather than a dict so repeated copies are all parsed.
+def legacy_parse(text):
+    blocks = []
+    current_section = None
+    for line in text.split('\n'):
+        line = line.strip()
+        if any(line.startswith(section) for section in valid_sections):
+            current_section = line.split(':', 1)[0].strip()
+            blocks.append((current_section, []))
+        elif current_section and line:
+            blocks[-1][1].append(line)
+    items = 0
+    for section, lines in blocks:
+        three = section in ("🍿 Cine Magic", "🎵 Songs", "🛍️ Products")
+        for line in lines:
+            if three:
+                match = re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+?)\s*-\s*(.+)', line)
+            else:
+                match = re.match(r'^\d+\.\s*(.+?)\s*-\s*(.+)', line)
+            if match:
+                [group.strip() for group in match.groups()]
+                items += 1
+    return items
+
+def single_pass(text):
+    parser = SectionStreamParser()
+    return sum(len(items) for _, items in parser.feed(text) + parser.close())
+
+def make_streamed(chunk_size):
+    def streamed(text):
+        parser = SectionStreamParser()
+        items = 0
+        for start in range(0, len(text), chunk_size):
+            for _, section_items in parser.feed(text[start:start + chunk_size]):
+                items += len(section_items)
+        for _, section_items in parser.close():
+            items += len(section_items)
+        return items
+    return streamed
+
+def bench(name, func, text, rounds):
+    func(text)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        items = func(text)
+        best = min(best, time.perf_counter() - start)
+    lines = text.count('\n') + 1
+    size = len(text.encode("utf-8"))
+    print(f"  {name:<12} {best * 1000:9.2f} ms  {lines / best:12,.0f} lines/s  "
+          f"{items / best:12,.0f} items/s  {size / best / 1e6:8.2f} MB/s  ({items} items)")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parser micro-benchmark over recorded completions")
+    arg_parser.add_argument("files", nargs="*", help="recorded completions (default: benchmarks/data/*.md)")
+    arg_parser.add_argument("--repeat", type=int, default=200, help="copies of each completion per parse")
+    arg_parser.add_argument("--rounds", type=int, default=5, help="timed rounds; the best one is reported")
+    arg_parser.add_argument("--chunk-size", type=int, default=24, help="characters per streamed chunk")
+    args = arg_parser.parse_args()
+
+    files = args.files or sorted(
+        os.path.join(DATA_DIR, name) for name in os.listdir(DATA_DIR) if name.endswith(".md")
+    )
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            completion = f.read()
+        text = "\n".join([completion] * args.repeat)
+        print(f"{os.path.basename(path)} x{args.repeat} ({len(text.encode('utf-8')) / 1e6:.2f} MB)")
+        bench("legacy", legacy_parse, text, args.rounds)
+        bench("single-pass", single_pass, text, args.rounds)
+        bench("streamed", make_streamed(args.chunk_size), text, args.rounds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# Prompt size report per template, for tracking regressions in input tokens.
+#
+#   python benchmarks/bench_prompts.py                 # report
+#   python benchmarks/bench_prompts.py --check         # exit 1 if a template grew past the baseline
+#   python benchmarks/bench_prompts.py --update        # accept the current sizes as the baseline
+#
+# Renders every template in moodx.prompts with the app's default inputs (all enabled categories,
+# all agents, CATALOG_CANDIDATES rerank candidates per catalog category) and prints the estimated
+# system, user and total tokens, next to the single user message the recommendation call used to
+# send. The baseline lives in benchmarks/data/prompt_tokens.json. Also prints the size of the
+# recorded completion in benchmarks/data/ as each output format would return it: markdown, the
+# compact positional JSON rows the json templates ask for (no "N/A" placeholders, empty trailing
+# fields left off), and compact JSON objects with named fields.
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.catalog import catalog_sections  # noqa: E402
+from moodx.categories import category_map, enabled_sections, item_format  # noqa: E402
+from moodx.config import CATALOG_CANDIDATES  # noqa: E402
+from moodx.parser import category_schemas, item_row, parse_sections  # noqa: E402
+from moodx.pipeline import agent_names  # noqa: E402
+from moodx.prompts import estimate_tokens, format_spec, json_spec, prompt_templates  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prompt_tokens.json")
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "recommendations.md")
+
+TEXT = "I'm excited and looking for new adventures!"
+MOOD = "You sound excited and ready for something new."
+CONTEXT = {"time": "18:30", "device": "mobile", "location": "home"}
+PREFERENCES = {"language": "English", "include_products": True}
+
+# The single user message generate_recommendations() used to send: every category, Movies
+# included, spelled out as ten numbered lines
+_legacy_order = ["🎥 Videos", "🎬 Movies", "🎵 Songs", "🛍️ Products", "🎮 Games", "📖 Articles",
+                 "💞 Connect", "✈️ Travel", "🍽️ Food", "🍿 Cine Magic"]
+
+def legacy_recommendations():
+    blocks = []
+    for section in _legacy_order:
+        line = item_format(category_map[section])
+        blocks.append(f"{section}:\n1. {line}\n2. {line}\n...\n10. {line}")
+    return f"""
+Generate recommendations based on the following details:
+- Mood: {MOOD}
+- Context: {CONTEXT}
+- Preferences: {PREFERENCES}
+
+For each of the categories listed below, please provide exactly 10 recommendations in the format shown. If a valid URL is not available for any recommendation, output "N/A" for the URL field.
+
+""" + "\n\n".join(blocks) + "\n"
+
+# CATALOG_CANDIDATES numbered candidates for every catalog category, as rerank_recommendations()
+# lists them
+def rerank_candidates():
+    lines = []
+    for section in catalog_sections:
+        category = category_map[section]
+        lines.append(f'"{category.key}" (pick {category.items}):')
+        lines += [f"{i}. " + " - ".join(f"{placeholder} {i}" for _, field, placeholder in category.columns
+                                       if field in ("title", "subtitle"))
+                  for i in range(CATALOG_CANDIDATES)]
+    return "\n".join(lines)
+
+def sample_values():
+    sections = enabled_sections(PREFERENCES)
+    request = {"mood": MOOD, "context": CONTEXT, "preferences": PREFERENCES}
+    fused = dict(request, mood=TEXT)
+    return {
+        "mood": {"text": TEXT},
+        "recommendations": dict(request, spec=format_spec(sections)),
+        "recommendations_fused": dict(fused, spec=format_spec(sections)),
+        "recommendations_json": dict(request, spec=json_spec(sections)),
+        "recommendations_json_fused": dict(fused, spec=json_spec(sections)),
+        "catalog_rerank": {"mood": MOOD, "context": CONTEXT, "candidates": rerank_candidates()},
+        "agent": {"agent": agent_names[0], "mood": MOOD, "context": CONTEXT},
+        "agents_batch": {"mood": MOOD, "context": CONTEXT, "agents": "\n".join(f"- {agent}" for agent in agent_names)},
+    }
+
+# The recorded completion re-encoded as each output format's reply -> {format: text}
+def reply_formats():
+    with open(DATA_PATH, encoding="utf-8") as f:
+        markdown = f.read()
+    sections = parse_sections(markdown)
+    rows, objects = {}, {}
+    for section, items in sections.items():
+        key, columns = category_schemas[section]
+        rows[key] = [item_row(section, item) for item in items]
+        objects[key] = [{name: getattr(item, field) for name, field in columns if getattr(item, field)}
+                        for item in items]
+    return {
+        "markdown": markdown,
+        "json rows": json.dumps(rows, ensure_ascii=False, separators=(",", ":")),
+        "json objects": json.dumps(objects, ensure_ascii=False, separators=(",", ":")),
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Estimated input tokens per prompt template")
+    arg_parser.add_argument("--check", action="store_true", help="fail if a template exceeds its baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.05,
+                            help="allowed growth over the baseline with --check (fraction)")
+    arg_parser.add_argument("--update", action="store_true", help="write the current sizes as the baseline")
+    args = arg_parser.parse_args()
+
+    sizes = {name: prompt_templates[name].tokens(**values) for name, values in sample_values().items()}
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{'template':<28} {'system':>7} {'user':>7} {'total':>7} {'baseline':>9}")
+    for name, size in sizes.items():
+        print(f"{name:<28} {size['system']:7d} {size['user']:7d} {size['total']:7d} {baseline.get(name, '-'):>9}")
+    legacy = estimate_tokens(legacy_recommendations())
+    print(f"{'(legacy recommendations)':<28} {0:7d} {legacy:7d} {legacy:7d}")
+    print(f"recommendations: {1 - sizes['recommendations']['total'] / legacy:.0%} fewer input tokens than the legacy prompt")
+
+    replies = reply_formats()
+    print(f"\n{'reply format':<28} {'chars':>7} {'tokens':>7} {'vs md':>7}")
+    for name, text in replies.items():
+        print(f"{name:<28} {len(text):7d} {estimate_tokens(text):7d} {len(text) / len(replies['markdown']):6.2f}x")
+
+    if args.update:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({name: size["total"] for name, size in sizes.items()}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {BASELINE_PATH}")
+    if args.check:
+        grown = [name for name, size in sizes.items()
+                 if name in baseline and size["total"] > baseline[name] * (1 + args.tolerance)]
+        for name in grown:
+            print(f"REGRESSION {name}: {sizes[name]['total']} tokens, baseline {baseline[name]}", file=sys.stderr)
+        return 1 if grown else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
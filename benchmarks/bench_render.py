@@ -0,0 +1,118 @@
+# Tab rendering micro-benchmark over the recorded recommendation completions.
+#
+#   python benchmarks/bench_render.py [--rounds 50] [files ...]
+#
+# Builds the HTML of every tab two ways without a Streamlit server: the per-item f-strings the
+# renderers used to send as one st.markdown call each (plus the section open/close calls), and
+# moodx.ui.section_html(), which sends one call per tab. Reports per page the build time, the
+# time including the st.markdown calls, the number of calls and the bytes of HTML sent.
+import argparse
+import os
+import sys
+import time
+
+import streamlit as st
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.parser import parse_sections  # noqa: E402
+from moodx.categories import category_map  # noqa: E402
+from moodx.ui import ordered_sections, section_html, tab_names  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Item markup of the old per-item renderers, indentation included since it was sent as well
+_legacy_items = {
+    "🍿 Cine Magic": lambda item, link: f"""
+        <div class="item">
+            <b>{item.title}</b><br>
+            <em>{item.subtitle}</em><br>
+            {link}
+        </div>
+        """,
+    "🎵 Songs": lambda item, link: f"""
+        <div class="item">
+            <b>{item.title}</b> by {item.subtitle}<br>
+            {link}
+        </div>
+        """,
+    "🛍️ Products": lambda item, link: f"""
+        <div class="item">
+            <b>{item.title}</b><br>
+            {item.extra}<br>
+            {link}
+        </div>
+        """,
+    "🎮 Games": lambda item, link: f"""
+        <div class="item">
+            <b>{item.title}</b><br>
+            <em>Platform: {item.subtitle}</em>
+        </div>
+        """,
+}
+
+def _legacy_link_item(item, link):
+    return f"""
+        <div class="item">
+            <b>{item.title}</b><br>
+            {link}
+        </div>
+        """
+
+# One string per former st.markdown call: section open, header, one per item, section close
+def legacy_calls(sections):
+    calls = []
+    for section in ordered_sections:
+        render_item = _legacy_items.get(section, _legacy_link_item)
+        label = category_map[section].label
+        calls.append("<div class='section'>")
+        calls.append(f"<div class='header'>{tab_names[section]}</div>")
+        for item in sections.get(section, []):
+            link = f'<a href="{item.url}" target="_blank">{label}</a>' if item.url else "Link Coming Soon"
+            calls.append(render_item(item, link))
+        calls.append("</div>")
+    return calls
+
+def batched_calls(sections):
+    return [section_html(section, sections.get(section, [])) for section in ordered_sections]
+
+# Builds the calls and sends each through st.markdown. Outside `streamlit run` the deltas go
+# nowhere, so this is the per-call cost in the script thread before any network time.
+def emit(build, sections):
+    calls = build(sections)
+    for call in calls:
+        st.markdown(call, unsafe_allow_html=True)
+    return calls
+
+def bench(name, build, sections, rounds):
+    emit(build, sections)
+    best_build = best_emit = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        calls = build(sections)
+        best_build = min(best_build, time.perf_counter() - start)
+        start = time.perf_counter()
+        emit(build, sections)
+        best_emit = min(best_emit, time.perf_counter() - start)
+    size = sum(len(call.encode("utf-8")) for call in calls)
+    print(f"  {name:<8} build {best_build * 1e3:7.3f} ms  build+st.markdown {best_emit * 1e3:7.3f} ms  "
+          f"{len(calls):4d} calls  {size:7,d} bytes")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Tab rendering micro-benchmark over recorded completions")
+    arg_parser.add_argument("files", nargs="*", help="recorded completions (default: benchmarks/data/*.md)")
+    arg_parser.add_argument("--rounds", type=int, default=50, help="timed rounds; the best one is reported")
+    args = arg_parser.parse_args()
+
+    files = args.files or sorted(
+        os.path.join(DATA_DIR, name) for name in os.listdir(DATA_DIR) if name.endswith(".md")
+    )
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            sections = parse_sections(f.read())
+        print(os.path.basename(path))
+        bench("legacy", legacy_calls, sections, args.rounds)
+        bench("batched", batched_calls, sections, args.rounds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# End-to-end load test of the page pipeline against the mock Groq server.
+#
+#   python benchmarks/load_test.py [--sessions 8] [--pages 5] [--mode stream] [--pipeline serial]
+#                                  [--format markdown] [--agents per-agent]
+#   python benchmarks/load_test.py --url http://127.0.0.1:8008/openai/v1   # an already running mock
+#
+# Each session runs the same work as one click of Generate Recommendations in app2.py: the page
+# flow of moodx.pipeline.generate_page (without a result cache), then the agent fan-out, one page
+# after the other. All sessions share one client, as every Streamlit session in a process does.
+# The mock is started in-process unless --url is given; it takes the options of
+# benchmarks/mock_groq.py.
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mock_groq import add_arguments, start_server  # noqa: E402
+from moodx.client import HedgePolicy, HTTPTransport, RateLimiter, create_client  # noqa: E402
+from moodx.pipeline import (  # noqa: E402
+    agent_names,
+    generate_agent_recommendations,
+    generate_agent_recommendations_batched,
+    generate_page,
+)
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+# One page: returns (seconds to the first rendered section, seconds for the whole page)
+def load_page(llm, text, mode, pipeline_mode, output_format, agents):
+    started = time.perf_counter()
+    first_section = None
+    preferences = {"language": "English", "include_products": True}
+    # No result cache: every page is generated
+    for kind, value in generate_page(llm, None, text, preferences, mode=mode, pipeline_mode=pipeline_mode,
+                                     output_format=output_format):
+        if kind == "section":
+            first_section = first_section or time.perf_counter() - started
+        elif kind == "done":
+            page = value
+    first_section = first_section or time.perf_counter() - started
+    if agents == "per-agent":
+        list(generate_agent_recommendations(llm, agent_names, page["mood"], page["context"]))
+    elif agents == "batched":
+        list(generate_agent_recommendations_batched(llm, agent_names, page["mood"], page["context"]))
+    return first_section, time.perf_counter() - started
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="End-to-end page load test against the mock Groq server")
+    arg_parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    arg_parser.add_argument("--pages", type=int, default=5, help="pages generated per session")
+    arg_parser.add_argument("--mode", choices=["single", "stream", "split"], default="stream",
+                            help="how the recommendations are requested (RECOMMENDATION_MODE)")
+    arg_parser.add_argument("--pipeline", choices=["serial", "parallel", "fused"], default="serial",
+                            help="how mood analysis is ordered against the recommendations (PIPELINE_MODE)")
+    arg_parser.add_argument("--format", choices=["markdown", "json"], default="markdown",
+                            help="recommendation reply format (OUTPUT_FORMAT)")
+    arg_parser.add_argument("--agents", choices=["per-agent", "batched", "none"], default="per-agent")
+    arg_parser.add_argument("--shared-text", action="store_true",
+                            help="every page submits the same text (exercises request coalescing)")
+    arg_parser.add_argument("--client-rpm", type=int, default=0,
+                            help="client-side rate limit in requests per minute (0 = off)")
+    arg_parser.add_argument("--hedge", type=float, default=0.0,
+                            help="hedge the recommendation call with this budget, e.g. 0.05 (0 = off)")
+    arg_parser.add_argument("--hedge-percentile", type=float, default=0.95,
+                            help="latency percentile after which a hedge is sent")
+    arg_parser.add_argument("--url", help="API root of a running mock; default: start one in-process")
+    add_arguments(arg_parser)
+    args = arg_parser.parse_args()
+
+    server = mock = None
+    base_url = args.url
+    if not base_url:
+        server, mock = start_server(args)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/openai/v1"
+    llm = create_client("mock-key", transport=HTTPTransport(pool_size=max(16, args.sessions * 2)),
+                        limiter=RateLimiter(rpm=args.client_rpm, tpm=0),
+                        hedge=HedgePolicy("recommendations" if args.hedge else "",
+                                          args.hedge_percentile, args.hedge))
+    llm.endpoint = f"{base_url.rstrip('/')}/chat/completions"
+
+    first_sections = []
+    totals = []
+    errors = []
+    lock = threading.Lock()
+
+    def session(index):
+        for page in range(args.pages):
+            text = "I'm excited and looking for new adventures!" if args.shared_text else \
+                f"I'm excited and looking for new adventures! (session {index}, page {page})"
+            try:
+                first_section, total = load_page(llm, text, args.mode, args.pipeline, args.format, args.agents)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                first_sections.append(first_section)
+                totals.append(total)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    transport = llm.transport.stats()
+    print(f"{args.sessions} sessions x {args.pages} pages, mode={args.mode}, pipeline={args.pipeline}, "
+          f"format={args.format}, agents={args.agents}: "
+          f"{len(totals)} ok, {len(errors)} failed in {elapsed:.2f}s")
+    print(f"  pages/s                {len(totals) / elapsed:8.2f}")
+    print(f"  upstream req/s         {transport['requests'] / elapsed:8.2f}  "
+          f"({transport['requests']} requests, {transport['connections_opened']} connections)")
+    for name, values in (("page", totals), ("first section", first_sections)):
+        print(f"  {name + ' latency':<22} p50 {percentile(values, 0.5) or 0:7.3f}s  "
+              f"p95 {percentile(values, 0.95) or 0:7.3f}s  p99 {percentile(values, 0.99) or 0:7.3f}s")
+    limiter = llm.limiter.stats()
+    print(f"  retries {limiter['retries']}, client queued {limiter['queued']} ({limiter['wait_seconds']}s), "
+          f"coalesced {llm.singleflight.stats()['coalesced']}"
+          + (f", mock throttled {mock.throttled}" if mock else ""))
+    if args.hedge:
+        hedge = llm.hedge.stats()
+        print(f"  hedged {hedge['hedged']} of {hedge['calls']} recommendation calls, "
+              f"{hedge['hedge_wins']} answered first by the hedge")
+    if llm.router:
+        for model, stats in sorted(llm.router.stats().items()):
+            print(f"  {model:<22} {stats['calls']:5d} calls  mean {stats['mean_seconds'] or 0:6.3f}s  "
+                  f"{stats['errors']} errors, {stats['fallbacks']} fallbacks  ${stats['cost_usd']:.4f}")
+    if errors:
+        print(f"  first error: {errors[0]}")
+    if server:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# Local stand-in for Groq's /openai/v1/chat/completions endpoint, for load tests.
+#
+#   python benchmarks/mock_groq.py [--port 8008] [--ttft-ms 250] [--tokens-per-second 300]
+#                                  [--error-429-rate 0.02] [--rpm 0]
+#   GROQ_BASE_URL=http://127.0.0.1:8008/openai/v1 streamlit run app2.py
+#
+# Replies are canned from the recorded completion in benchmarks/data/ and shaped after the
+# prompt: the requested categories, the JSON variants, catalog rerank picks, a mood sentence or
+# agent text, in exactly the formats the pipeline parses. Latency is a time to first token
+# drawn from the chosen distribution plus completion tokens at --tokens-per-second; streamed
+# replies are paced over that time as SSE chunks. 429s carry retry-after and x-ratelimit-*
+# headers like the real API.
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.parser import MOOD_HEADER, category_schemas, item_row, parse_sections, valid_sections  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "recommendations.md")
+
+# The mood reply is tagged from the user's text, so different texts lead to different downstream
+# prompts (as with a real model) instead of being coalesced into one request
+MOOD_REPLY = "You sound excited and ready for something new"
+AGENT_REPLY = "Block out an hour this afternoon for something new: book a class or plan a day trip."
+
+# Recorded completion split into its category blocks, plus the parsed items for the JSON replies
+def load_canned(path=DATA_PATH):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    blocks = {}
+    section = None
+    for line in text.split("\n"):
+        stripped = line.strip()
+        header = next((h for h in valid_sections if stripped.startswith(h)), None)
+        if header:
+            section = header
+            blocks[section] = []
+        elif section and stripped:
+            blocks[section].append(stripped)
+    return {section: "\n".join(lines) for section, lines in blocks.items()}, parse_sections(text)
+
+def sample_delay(dist, mean, sigma):
+    if mean <= 0:
+        return 0.0
+    if dist == "fixed":
+        return mean
+    if dist == "exponential":
+        return random.expovariate(1 / mean)
+    if dist == "normal":
+        return max(0.0, random.gauss(mean, sigma))
+    # lognormal with the given mean and sigma as the spread of the underlying normal
+    return random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+
+class MockGroq:
+    def __init__(self, args):
+        self.args = args
+        self.blocks, self.items = load_canned()
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self.requests = 0
+        self.throttled = 0
+
+    # Reply text for a request's system and user messages, mirroring moodx.prompts
+    def reply(self, system, prompt, json_mode):
+        if json_mode:
+            if "agent name" in system:
+                return json.dumps({name: AGENT_REPLY for name in re.findall(r"^- (.+)$", prompt, re.M)})
+            if "recommendation ranker" in system:
+                # Catalog rerank: the first candidates of every key, in order
+                return json.dumps({key: list(range(int(count)))
+                                   for key, count in re.findall(r'^"(\w+)" \(pick (\d+)\):$', prompt, re.M)})
+            keys = {schema[0]: section for section, schema in category_schemas.items()}
+            data = {}
+            for key in re.findall(r'^"(\w+)": \[', prompt, re.M):
+                section = keys.get(key)
+                if section:
+                    data[key] = [item_row(section, item) for item in self.items.get(section, [])]
+            if '"mood" field' in system:
+                data["mood"] = f"{MOOD_REPLY}."
+            return json.dumps(data, separators=(",", ":"))
+        if system.startswith("Analyze the mood"):
+            return f"{MOOD_REPLY} (#{zlib.crc32(prompt.encode('utf-8')):08x})."
+        # Only the categories the prompt asks for
+        requested = [section for section in valid_sections
+                     if re.search(rf"^{re.escape(section)}( \(\d+\))?:", prompt, re.M) and section in self.blocks]
+        if requested:
+            text = "\n\n".join(f"{section}:\n{self.blocks[section]}" for section in requested)
+            if MOOD_HEADER in system:
+                return f"{MOOD_HEADER}: {MOOD_REPLY}.\n\n{text}"
+            return text
+        return AGENT_REPLY
+
+    # None if the request may proceed, else the retry-after seconds of a 429
+    def admit(self):
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            if self.args.rpm:
+                while self._recent and self._recent[0] <= now - 60:
+                    self._recent.popleft()
+                if len(self._recent) >= self.args.rpm:
+                    self.throttled += 1
+                    return max(0.05, self._recent[0] + 60 - now)
+                self._recent.append(now)
+            if random.random() < self.args.error_429_rate:
+                self.throttled += 1
+                return self.args.retry_after
+        return None
+
+    # x-ratelimit-*-requests headers for the --rpm window
+    def request_headers(self):
+        with self._lock:
+            if not self.args.rpm:
+                return [("x-ratelimit-remaining-requests", "14400")]
+            reset = self._recent[0] + 60 - time.monotonic() if self._recent else 0.0
+            return [("x-ratelimit-remaining-requests", str(max(0, self.args.rpm - len(self._recent)))),
+                    ("x-ratelimit-reset-requests", f"{max(0.0, reset):.2f}s")]
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # Clients drop keep-alive connections whenever they like; that is not worth a traceback
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_json(self, status, body, extra_headers=()):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in extra_headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        mock = self.mock
+        args = mock.args
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.rstrip("/") != "/openai/v1/chat/completions":
+            self.send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        retry_after = mock.admit()
+        if retry_after is not None:
+            self.send_json(429, {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                           [("retry-after", f"{retry_after:.2f}")] + mock.request_headers())
+            return
+        if random.random() < args.error_5xx_rate:
+            self.send_json(503, {"error": {"message": "Service unavailable"}})
+            return
+
+        system = "\n".join(message["content"] for message in body["messages"] if message["role"] == "system")
+        content = mock.reply(system, body["messages"][-1]["content"], bool(body.get("response_format")))
+        prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4
+        completion_tokens = max(1, len(content) // 4)
+        finish_reason = "stop"
+        if completion_tokens > body.get("max_tokens", completion_tokens):
+            completion_tokens = body["max_tokens"]
+            content = content[:completion_tokens * 4]
+            finish_reason = "length"
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        headers = [
+            ("x-ratelimit-limit-tokens", str(args.tpm_header)),
+            ("x-ratelimit-remaining-tokens", str(args.tpm_header)),
+        ] + mock.request_headers()
+        time.sleep(sample_delay(args.ttft_dist, args.ttft_ms / 1000, args.ttft_sigma))
+        generation = completion_tokens / args.tokens_per_second if args.tokens_per_second else 0.0
+
+        if not body.get("stream"):
+            time.sleep(generation)
+            self.send_json(200, {
+                "id": "mock", "object": "chat.completion", "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": finish_reason}],
+                "usage": usage,
+            }, headers)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        pieces = [content[i:i + args.chunk_chars] for i in range(0, len(content), args.chunk_chars)]
+        for i, piece in enumerate(pieces):
+            time.sleep(generation / len(pieces))
+            chunk = {"choices": [{"index": 0, "delta": {"content": piece},
+                                  "finish_reason": finish_reason if i == len(pieces) - 1 else None}]}
+            if i == len(pieces) - 1:
+                chunk["x_groq"] = {"usage": usage}
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n")
+        self.write_chunk("data: [DONE]\n\n")
+        self.write_chunk("")
+
+def add_arguments(arg_parser):
+    arg_parser.add_argument("--ttft-ms", type=float, default=250, help="mean time to first token")
+    arg_parser.add_argument("--ttft-dist", choices=["fixed", "normal", "lognormal", "exponential"],
+                            default="lognormal", help="distribution of the time to first token")
+    arg_parser.add_argument("--ttft-sigma", type=float, default=0.5,
+                            help="spread: seconds for normal, log-space sigma for lognormal")
+    arg_parser.add_argument("--tokens-per-second", type=float, default=300, help="generation rate (0 = instant)")
+    arg_parser.add_argument("--chunk-chars", type=int, default=16, help="characters per streamed SSE chunk")
+    arg_parser.add_argument("--error-429-rate", type=float, default=0.0, help="fraction of requests answered 429")
+    arg_parser.add_argument("--error-5xx-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    arg_parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds on injected 429s")
+    arg_parser.add_argument("--rpm", type=int, default=0, help="enforced requests per minute (0 = unlimited)")
+    arg_parser.add_argument("--tpm-header", type=int, default=1000000,
+                            help="tokens per minute reported in x-ratelimit-limit-tokens")
+
+# Starts the server on a background thread; returns (server, mock)
+def start_server(args, host="127.0.0.1", port=0):
+    mock = MockGroq(args)
+    handler = type("MockHandler", (Handler,), {"mock": mock})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, mock
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Local mock of the Groq chat completions API")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8008)
+    add_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    server, mock = start_server(args, args.host, args.port)
+    print(f"Mock Groq API on http://{args.host}:{server.server_address[1]}/openai/v1", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"{mock.requests} requests, {mock.throttled} throttled", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
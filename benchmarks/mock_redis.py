@@ -0,0 +1,161 @@
+# Local stand-in for a Redis server, for the shared result cache.
+#
+#   python benchmarks/mock_redis.py [--port 6379] [--latency-ms 0]
+#   RESULT_CACHE_URL=redis://127.0.0.1:6379/0 streamlit run app2.py
+#
+# Speaks enough RESP for moodx.cache.RedisBackend and redis-cli: PING, GET, MGET, SET with EX/PX,
+# DEL, DBSIZE, FLUSHDB, SELECT and AUTH (accepted, not checked). Everything lives in one dict
+# guarded by a lock; expired keys are dropped when read. --latency-ms delays every batch of
+# pipelined commands, like the round trip to a remote instance.
+import argparse
+import socketserver
+import sys
+import threading
+import time
+
+class Store:
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        self.commands = 0
+
+    def _get(self, key, now):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= now:
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, command):
+        name = command[0].upper()
+        args = command[1:]
+        now = time.monotonic()
+        with self.lock:
+            self.commands += 1
+            if name == b"PING":
+                return b"PONG"
+            if name in (b"SELECT", b"AUTH"):
+                return b"OK"
+            if name == b"GET":
+                return self._get(args[0], now)
+            if name == b"MGET":
+                return [self._get(key, now) for key in args]
+            if name == b"SET":
+                expires = None
+                options = [arg.upper() for arg in args[2:]]
+                for i, option in enumerate(options[:-1]):
+                    if option == b"EX":
+                        expires = now + float(args[3 + i])
+                    elif option == b"PX":
+                        expires = now + float(args[3 + i]) / 1000
+                self.data[args[0]] = (args[1], expires)
+                return b"OK"
+            if name == b"DEL":
+                return sum(self.data.pop(key, None) is not None for key in args)
+            if name == b"DBSIZE":
+                return len(self.data)
+            if name == b"FLUSHDB":
+                self.data.clear()
+                return b"OK"
+        return Exception(f"ERR unknown command '{name.decode('utf-8', 'replace')}'")
+
+def encode(reply):
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Exception):
+        return f"-{reply}\r\n".encode("utf-8")
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(encode(item) for item in reply)
+    if reply in (b"OK", b"PONG"):
+        return b"+" + reply + b"\r\n"
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+# Complete commands at the start of buf -> (commands, bytes consumed); a partial command at the
+# end waits for the next read
+def parse_commands(buf):
+    commands = []
+    pos = 0
+    while pos < len(buf):
+        end = buf.find(b"\r\n", pos)
+        if end < 0:
+            break
+        if buf[pos:pos + 1] != b"*":
+            # Inline command, as typed into a telnet session
+            commands.append(bytes(buf[pos:end]).split())
+            pos = end + 2
+            continue
+        count = int(buf[pos + 1:end])
+        cursor = end + 2
+        command = []
+        for _ in range(count):
+            end = buf.find(b"\r\n", cursor)
+            if end < 0:
+                break
+            length = int(buf[cursor + 1:end])
+            if len(buf) < end + 2 + length + 2:
+                break
+            command.append(bytes(buf[end + 2:end + 2 + length]))
+            cursor = end + 2 + length + 2
+        if len(command) < count:
+            break
+        commands.append(command)
+        pos = cursor
+    return commands, pos
+
+class Handler(socketserver.BaseRequestHandler):
+    store = None
+    latency = 0.0
+
+    # Everything that arrived in one read (a client's pipeline) is answered in one write
+    def handle(self):
+        buf = bytearray()
+        try:
+            while True:
+                data = self.request.recv(65536)
+                if not data:
+                    return
+                buf += data
+                commands, consumed = parse_commands(buf)
+                del buf[:consumed]
+                if not commands:
+                    continue
+                if self.latency:
+                    time.sleep(self.latency)
+                self.request.sendall(b"".join(encode(self.store.execute(command)) for command in commands if command))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def add_arguments(arg_parser):
+    arg_parser.add_argument("--latency-ms", type=float, default=0.0, help="delay per batch of pipelined commands")
+
+# Starts the server on a background thread; returns (server, store)
+def start_server(args, host="127.0.0.1", port=0):
+    store = Store()
+    handler = type("MockRedisHandler", (Handler,), {"store": store, "latency": args.latency_ms / 1000})
+    server = socketserver.ThreadingTCPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, store
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Local stand-in for a Redis server")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=6379)
+    add_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    server, store = start_server(args, args.host, args.port)
+    print(f"Mock Redis on redis://{args.host}:{server.server_address[1]}/0", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"{store.commands} commands, {len(store.data)} keys", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# MoodX core: Groq client, result cache, reply parsing and the recommendation pipeline, usable
+# from scripts and workers without Streamlit (the Streamlit pieces live in moodx.ui).
+#
+# Names are resolved on first access (PEP 562), so `import moodx` loads nothing else and each
+# entry point only pays for the submodules it actually uses.
+import importlib
+
+_exports = {
+    "ChatGroq": "client",
+    "HTTPTransport": "client",
+    "HedgePolicy": "client",
+    "ModelRouter": "client",
+    "RateLimiter": "client",
+    "SingleFlight": "client",
+    "TokenBudget": "client",
+    "create_client": "client",
+    "RedisBackend": "cache",
+    "ResultCache": "cache",
+    "SQLiteBackend": "cache",
+    "Catalog": "catalog",
+    "mood_tags": "catalog",
+    "open_catalog": "catalog",
+    "Category": "categories",
+    "categories": "categories",
+    "enabled_sections": "categories",
+    "make_cache_key": "cache",
+    "open_backend": "cache",
+    "MOOD_HEADER": "parser",
+    "RecommendationItem": "parser",
+    "SectionStreamParser": "parser",
+    "category_schemas": "parser",
+    "parse_json_recommendations": "parser",
+    "parse_sections": "parser",
+    "valid_sections": "parser",
+    "PromptTemplate": "prompts",
+    "prompt_templates": "prompts",
+    "agent_names": "pipeline",
+    "analyze_mood": "pipeline",
+    "cached_analyze_mood": "pipeline",
+    "category_formats": "pipeline",
+    "generate_agent_recommendation": "pipeline",
+    "generate_agent_recommendations": "pipeline",
+    "generate_agent_recommendations_batched": "pipeline",
+    "generate_page": "pipeline",
+    "generate_recommendations": "pipeline",
+    "generate_recommendations_json": "pipeline",
+    "generate_recommendations_split": "pipeline",
+    "get_context": "pipeline",
+    "retrieve_recommendations": "pipeline",
+    "run_page": "pipeline",
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
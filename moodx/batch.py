@@ -0,0 +1,225 @@
+# Batch CLI: runs a JSONL file of {"user_text", "language", "include_products"} records through
+# the same page flow as the UI (moodx.pipeline.generate_page) without the UI.
+#
+#   python -m moodx.batch requests.jsonl -o results.jsonl [--concurrency 4]
+#
+# Results are appended to the output as they finish, not in input order; each carries the
+# 0-based input line number (and the record's "id", if it has one). Records that fail are
+# written with an "error" field and are not retried on resume.
+#
+# The input is read lazily with at most 2 x concurrency records in flight, so memory stays flat
+# however long the file is. A checkpoint next to the output records which lines are done and
+# how far the output was flushed; rerunning the same command resumes from it, dropping any
+# output written after the last checkpoint so no record appears twice. The checkpoint also
+# records the input file (path, size, mtime) and refuses to resume with a different one. Without
+# a checkpoint, existing output is kept and new results are appended after it.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+class CheckpointMismatch(Exception):
+    pass
+
+# Path, size and modification time of the input, to tell whether a checkpoint belongs to it
+def input_identity(path):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+# Lines below `watermark` are all done; `done` holds the finished lines above it, which is at
+# most the in-flight window plus whatever completed behind a slow record. `resumed` tells
+# whether an existing checkpoint was loaded.
+class Checkpoint:
+    def __init__(self, path, source=None):
+        self.path = path
+        self.source = source
+        self.watermark = 0
+        self.done = set()
+        self.output_offset = 0
+        self.resumed = os.path.exists(path)
+        if self.resumed:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("source") != source:
+                raise CheckpointMismatch(
+                    f"{path} was written for input {(state.get('source') or {}).get('path', '(unknown)')}, "
+                    f"which differs from {source['path'] if source else '(unknown)'} or has changed since; "
+                    f"delete the checkpoint or choose another output file")
+            self.watermark = state["watermark"]
+            self.done = set(state["done"])
+            self.output_offset = state["output_offset"]
+
+    def is_done(self, line):
+        return line < self.watermark or line in self.done
+
+    def mark(self, line):
+        self.done.add(line)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+
+    def save(self, output_offset):
+        self.output_offset = output_offset
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "watermark": self.watermark, "done": sorted(self.done),
+                       "output_offset": output_offset}, f)
+        os.replace(tmp_path, self.path)
+
+# Fixed-size uniform sample of latencies (reservoir sampling), so percentiles over millions of
+# records cost constant memory
+class LatencySample:
+    def __init__(self, size=10000):
+        self.size = size
+        self.values = []
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < self.size:
+                self.values[index] = value
+
+    def percentile(self, q):
+        if not self.values:
+            return None
+        values = sorted(self.values)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+def process_record(llm, cache, line_number, line, catalog=None):
+    from moodx.config import RECOMMENDATION_MODE
+    from moodx.parser import RecommendationItem
+    from moodx.pipeline import run_page
+
+    started = time.perf_counter()
+    result = {"line": line_number}
+    try:
+        record = json.loads(line)
+        if "id" in record:
+            result["id"] = record["id"]
+        user_text = record["user_text"]
+        preferences = {"language": record.get("language", "English"),
+                       "include_products": record.get("include_products", True)}
+        # The same page flow as the UI, with the same cache keys, so repeated texts in a campaign
+        # (or ones the UI already saw, with a shared cache) are generated once
+        # Streaming only pays off on a page that renders as it fills: take the reply in one piece
+        page = run_page(llm, cache, user_text, preferences, catalog=catalog,
+                        mode="single" if RECOMMENDATION_MODE == "stream" else RECOMMENDATION_MODE)
+        mood, sections = page["mood"], page["sections"]
+        result.update({
+            "user_text": user_text,
+            "preferences": preferences,
+            "mood": mood,
+            "sections": {
+                section: [RecommendationItem(*item)._asdict() for item in items]
+                for section, items in sections.items()
+            },
+        })
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency"] = round(time.perf_counter() - started, 3)
+    return result
+
+def run_batch(llm, cache, input_path, output_path, concurrency=4, checkpoint_path=None,
+              checkpoint_interval=5.0, catalog=None):
+    checkpoint = Checkpoint(checkpoint_path or output_path + ".checkpoint", input_identity(input_path))
+    latencies = LatencySample()
+    counts = {"ok": 0, "errors": 0, "resumed": checkpoint.watermark + len(checkpoint.done)}
+    started = time.perf_counter()
+    last_save = started
+    with open(input_path, encoding="utf-8") as source, open(output_path, "ab") as out, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if checkpoint.resumed:
+            # Anything past the checkpoint's offset belongs to records that will be redone
+            out.truncate(checkpoint.output_offset)
+            out.seek(checkpoint.output_offset)
+        else:
+            # A fresh run appends after whatever the output already holds
+            out.seek(0, os.SEEK_END)
+        lines = enumerate(source)
+        pending = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < concurrency * 2:
+                line_number, line = next(lines, (None, None))
+                if line_number is None:
+                    exhausted = True
+                elif not checkpoint.is_done(line_number):
+                    if line.strip():
+                        pending[executor.submit(process_record, llm, cache, line_number, line, catalog)] = line_number
+                    else:
+                        checkpoint.mark(line_number)
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                line_number = pending.pop(future)
+                result = future.result()
+                out.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+                checkpoint.mark(line_number)
+                counts["errors" if "error" in result else "ok"] += 1
+                latencies.add(result["latency"])
+            if time.perf_counter() - last_save >= checkpoint_interval:
+                out.flush()
+                checkpoint.save(out.tell())
+                last_save = time.perf_counter()
+        out.flush()
+        checkpoint.save(out.tell())
+    elapsed = time.perf_counter() - started
+    processed = counts["ok"] + counts["errors"]
+    return {
+        "records": processed,
+        "ok": counts["ok"],
+        "errors": counts["errors"],
+        "resumed_past": counts["resumed"],
+        "seconds": round(elapsed, 2),
+        "records_per_second": round(processed / elapsed, 2) if elapsed else 0.0,
+        "latency_p50": latencies.percentile(0.5),
+        "latency_p95": latencies.percentile(0.95),
+        "latency_p99": latencies.percentile(0.99),
+    }
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Bulk mood-to-recommendation jobs over JSONL")
+    arg_parser.add_argument("input", help="JSONL file of {user_text, language, include_products} records")
+    arg_parser.add_argument("-o", "--output", required=True, help="JSONL file results are appended to")
+    arg_parser.add_argument("--concurrency", type=int, default=4, help="records processed at once")
+    arg_parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint)")
+    arg_parser.add_argument("--checkpoint-interval", type=float, default=5.0,
+                            help="seconds between checkpoint writes")
+    args = arg_parser.parse_args(argv)
+
+    # The environment has to be complete before moodx.config is imported
+    from dotenv import load_dotenv
+    load_dotenv()
+    from moodx.cache import ResultCache
+    from moodx.catalog import open_catalog
+    from moodx.client import create_client
+    from moodx.metrics import metrics
+
+    llm = create_client()
+    catalog = open_catalog()
+    try:
+        summary = run_batch(llm, ResultCache(), args.input, args.output, max(1, args.concurrency),
+                            args.checkpoint, args.checkpoint_interval, catalog)
+    except CheckpointMismatch as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    summary["rate_limiter"] = llm.limiter.stats()
+    if catalog is not None:
+        summary["catalog"] = catalog.stats()
+    snapshot = metrics.snapshot()
+    summary["stages"] = snapshot["stages"]
+    summary["calls"] = snapshot["calls"]
+    summary["models"] = snapshot["models"]
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
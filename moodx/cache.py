@@ -0,0 +1,308 @@
+# Result caching: normalized cache keys and a thread-safe LRU/TTL cache with an optional shared
+# backend behind it, SQLite or Redis (sqlite3 and socket are only imported when one is configured).
+import hashlib
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from moodx.categories import categories, category_map
+from moodx.config import RESULT_CACHE_PATH, RESULT_CACHE_SIZE, RESULT_CACHE_TTL, RESULT_CACHE_URL
+from moodx.parser import RecommendationItem
+
+# Coarse part of the day, so cache keys stay stable within a morning/afternoon/evening
+def time_bucket(hour):
+    if 5 <= hour < 12:
+        return "morning"
+    if 12 <= hour < 17:
+        return "afternoon"
+    if 17 <= hour < 22:
+        return "evening"
+    return "night"
+
+def coarsen_context(context):
+    coarse = dict(context)
+    coarse["time"] = time_bucket(int(context["time"].split(":", 1)[0]))
+    return coarse
+
+def normalize_mood_text(text):
+    return " ".join(text.lower().split()).rstrip(".!?")
+
+def make_cache_key(kind, text, preferences=None, context=None):
+    raw = json.dumps([kind, normalize_mood_text(text), preferences,
+                      coarsen_context(context) if context else None], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+# Compact wire format for the shared backends: one tag byte, then UTF-8 JSON without whitespace,
+# zlib-compressed ("z") when that pays off. Parsed sections go as {category key: [item rows]} with
+# trailing empty fields dropped, and come back as RecommendationItems.
+_compress_above = 512
+_key_sections = {category.key: category.header for category in categories}
+
+def _is_sections(value):
+    return isinstance(value, dict) and all(section in category_map for section in value)
+
+def encode_value(value):
+    if _is_sections(value):
+        rows = {}
+        for section, items in value.items():
+            rows[category_map[section].key] = section_rows = []
+            for item in items:
+                row = list(item)
+                while row and not row[-1]:
+                    row.pop()
+                section_rows.append(row)
+        payload = {"s": rows}
+    else:
+        payload = {"v": value}
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) > _compress_above:
+        return b"z" + zlib.compress(data)
+    return b"j" + data
+
+def decode_value(data):
+    data = bytes(data)
+    payload = json.loads(zlib.decompress(data[1:]) if data[:1] == b"z" else data[1:])
+    if "s" in payload:
+        return {
+            _key_sections[key]: [RecommendationItem(*row) for row in rows]
+            for key, rows in payload["s"].items()
+        }
+    return payload["v"]
+
+# Shared store in a SQLite database in WAL mode, so readers never block the writer and any
+# number of processes can use the same file. WAL needs shared memory between the processes,
+# so the file has to be on a volume local to one host (e.g. replicas on the same machine);
+# replicas on different hosts should share a Redis instead. One connection per thread.
+class SQLiteBackend:
+    name = "sqlite"
+
+    def __init__(self, path, timeout=5.0, purge_every=200):
+        self.path = path
+        self.timeout = timeout
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS cache_entries (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+        db.commit()
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            import sqlite3
+            db = self._local.db = sqlite3.connect(self.path, timeout=self.timeout)
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # One query for all keys -> {key: encoded value} of the live ones
+    def get_many(self, keys):
+        placeholders = ",".join("?" * len(keys))
+        rows = self._connection().execute(
+            f"SELECT key, value FROM cache_entries WHERE key IN ({placeholders}) AND expires > ?",
+            (*keys, time.time()))
+        return dict(rows)
+
+    # One transaction for all (key, encoded value) pairs; expired rows are purged now and then
+    def set_many(self, items, ttl):
+        now = time.time()
+        db = self._connection()
+        with db:
+            db.executemany("INSERT OR REPLACE INTO cache_entries (key, value, expires) VALUES (?, ?, ?)",
+                           [(key, data, now + ttl) for key, data in items])
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                db.execute("DELETE FROM cache_entries WHERE expires <= ?", (now,))
+
+class RedisError(Exception):
+    pass
+
+# Shared store in anything that speaks the Redis protocol (RESP): MGET for lookups, and all SETs
+# of a write pipelined in one round trip, with the TTL enforced by the server. One connection per
+# thread, reopened after a network error. benchmarks/mock_redis.py is a local stand-in.
+class RedisBackend:
+    name = "redis"
+
+    def __init__(self, url, timeout=2.0, prefix="moodx:"):
+        from urllib.parse import urlsplit
+        parts = urlsplit(url)
+        self.address = (parts.hostname or "127.0.0.1", parts.port or 6379)
+        self.password = parts.password
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout = timeout
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            import socket
+            sock = socket.create_connection(self.address, self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection = self._local.connection = (sock, sock.makefile("rb"))
+            setup = ([("AUTH", self.password)] if self.password else []) + ([("SELECT", self.db)] if self.db else [])
+            if setup:
+                try:
+                    self._pipeline(setup)
+                except RedisError:
+                    # Retried from scratch on the next call instead of running unauthenticated
+                    self._local.connection = None
+                    sock.close()
+                    raise
+        return connection
+
+    @staticmethod
+    def _encode(command):
+        out = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(out)
+
+    def _read(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Redis closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            # Returned, not raised, so the rest of a pipeline's replies are still read
+            return RedisError(rest.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read(reader) for _ in range(length)]
+        raise ConnectionError(f"Unexpected Redis reply {line!r}")
+
+    # Sends every command in one write and reads all replies in order before raising the first
+    # error reply. Any other failure drops the connection: replies left unread on it would be
+    # taken for the next command's.
+    def _pipeline(self, commands):
+        sock, reader = self._connection()
+        try:
+            sock.sendall(b"".join(self._encode(command) for command in commands))
+            replies = [self._read(reader) for _ in commands]
+        except Exception:
+            self._local.connection = None
+            sock.close()
+            raise
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def get_many(self, keys):
+        values = self._pipeline([("MGET", *(self.prefix + key for key in keys))])[0]
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items, ttl):
+        self._pipeline([("SET", self.prefix + key, data, "PX", int(ttl * 1000)) for key, data in items])
+
+# "redis://host:port/db", "sqlite:///path" or a bare SQLite path -> backend (None if empty)
+def open_backend(url):
+    if not url:
+        return None
+    if url.startswith("redis://"):
+        return RedisBackend(url)
+    if url.startswith("sqlite://"):
+        url = url[len("sqlite://"):]
+    return SQLiteBackend(url)
+
+# Thread-safe LRU cache with per-entry TTL in front of an optional shared backend. Lookups that
+# miss memory go to the backend in one round trip per get_many(), and writes go through to it,
+# so every replica pointing at the same backend shares one pool of results. A failing backend
+# only costs its misses; the memory cache keeps working.
+class ResultCache:
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, path=RESULT_CACHE_PATH, url=RESULT_CACHE_URL,
+                 backend=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend or open_backend(url or path)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+        self.backend_errors = 0
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    # -> {key: value} for the keys found in memory or the backend
+    def get_many(self, keys):
+        now = time.time()
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[1] > now:
+                        self._entries.move_to_end(key)
+                        found[key] = entry[0]
+                        continue
+                    del self._entries[key]
+                missing.append(key)
+        shared = {}
+        if missing and self.backend is not None:
+            try:
+                shared = {key: decode_value(data) for key, data in self.backend.get_many(missing).items()}
+            except Exception:
+                with self._lock:
+                    self.backend_errors += 1
+        with self._lock:
+            for key, value in shared.items():
+                self._store(key, value, now + self.ttl)
+            self.hits += len(found) + len(shared)
+            self.shared_hits += len(shared)
+            self.misses += len(missing) - len(shared)
+        found.update(shared)
+        return found
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, items):
+        expires = time.time() + self.ttl
+        with self._lock:
+            for key, value in items.items():
+                self._store(key, value, expires)
+        if self.backend is not None:
+            try:
+                self.backend.set_many([(key, encode_value(value)) for key, value in items.items()], self.ttl)
+            except Exception:
+                with self._lock:
+                    self.backend_errors += 1
+
+    def _store(self, key, value, expires):
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend.name if self.backend is not None else "memory",
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "evictions": self.evictions,
+                "backend_errors": self.backend_errors,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
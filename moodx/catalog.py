@@ -0,0 +1,190 @@
+# Local recommendation catalog: every item the model has recommended, kept in a SQLite file and
+# indexed by the moods it was recommended for. Evergreen items (classic films, well-known songs,
+# recipes) come back for the same moods again and again, so once they are in the catalog a tab
+# can be served from an index lookup instead of a 70B completion.
+#
+# Items are unique per category, language and title. The inverted index (catalog_tags) maps a
+# mood tag, language and category to items, with a weight counting how often the model
+# recommended the item for that mood, so a lookup only reads its own postings. A lookup sums
+# the weights of the tags in the mood text, so the items recommended most often for the closest
+# moods come first.
+import re
+import threading
+
+from moodx.categories import categories, category_map
+from moodx.config import CATALOG_CATEGORIES, CATALOG_MODE, CATALOG_PATH
+from moodx.parser import RecommendationItem
+
+# Canonical mood tags and the word prefixes that map to them, so "thrilled", "excitement" and
+# "pumped" all index (and find) the same items. Prefixes are kept specific: a generic one
+# ("down", "new", "good") would tag texts that say nothing about a mood.
+mood_lexicon = {
+    "happy": ("happ", "joy", "cheer", "glad", "delight", "positiv", "upbeat", "elat"),
+    "excited": ("excit", "thrill", "eager", "pumped", "hyped", "enthusias", "energeti", "energiz", "energis"),
+    "adventurous": ("adventur", "explor", "spontane", "wanderlust"),
+    "calm": ("calm", "relax", "peace", "chill", "seren", "cozy", "cosy", "mellow", "tranquil"),
+    "sad": ("sad", "unhapp", "depress", "gloom", "heartbr", "cried", "crying", "tearful", "grief", "griev",
+            "melanchol", "miserab"),
+    "anxious": ("anxi", "nervous", "worr", "uneas", "panic", "restless", "tense"),
+    "stressed": ("stress", "overwhelm", "pressur", "frazzl", "burnout"),
+    "tired": ("tired", "exhaust", "sleepy", "drained", "fatigu", "weary"),
+    "angry": ("angr", "furious", "annoy", "frustrat", "irritat", "upset"),
+    "lonely": ("lonel", "alone", "isolat"),
+    "romantic": ("romant", "crush", "dating", "affection"),
+    "nostalgic": ("nostalg", "reminisc", "childhood"),
+    "bored": ("bored", "boring", "dull", "monoton"),
+    "motivated": ("motivat", "determin", "focus", "ambitio", "inspir", "driven", "productiv"),
+    "curious": ("curio", "inquisitiv", "fascinat"),
+    "grateful": ("grateful", "thank", "bless", "appreciat"),
+}
+
+_clause = re.compile(r"[.,;:!?]+")
+_word = re.compile(r"[a-z']+")
+# A negator turns off the next few words of its clause: "not happy at all", "no energy"
+_negators = {"not", "no", "never", "nor", "without", "cannot", "hardly"}
+_negation_scope = 3
+
+# Canonical tags of every mood word in the text that is not negated, in lexicon order
+def mood_tags(text):
+    words = set()
+    for clause in _clause.split(text.lower().replace("\u2019", "'")):
+        negated_until = -1
+        for i, word in enumerate(_word.findall(clause)):
+            if word in _negators or word.endswith("n't"):
+                negated_until = i + _negation_scope
+            elif i > negated_until:
+                words.add(word)
+    return [tag for tag, prefixes in mood_lexicon.items()
+            if any(word.startswith(prefix) for word in words for prefix in prefixes)]
+
+def _normalize(*parts):
+    return " - ".join(" ".join(part.lower().split()) for part in parts)
+
+# Headers of the categories the catalog keeps; the others (prices, trending videos) always
+# come from the model
+catalog_sections = [category.header for category in categories if category.key in CATALOG_CATEGORIES.split(",")]
+
+# The catalog in a SQLite database in WAL mode, one connection per thread, like the shared
+# result cache. Failures are counted and behave like an empty catalog, so the page falls back
+# to the model.
+class Catalog:
+    def __init__(self, path=CATALOG_PATH, retrieve=True, sections=None, timeout=5.0):
+        self.path = path
+        self.retrieve = retrieve
+        self.sections = catalog_sections if sections is None else sections
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.served = 0
+        self.gaps = 0
+        self.added = 0
+        self.errors = 0
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS catalog_items (id INTEGER PRIMARY KEY, category TEXT NOT NULL, "
+                   "language TEXT NOT NULL, norm TEXT NOT NULL, title TEXT, subtitle TEXT, url TEXT, extra TEXT, "
+                   "UNIQUE (category, language, norm))")
+        db.execute("CREATE TABLE IF NOT EXISTS catalog_tags (tag TEXT NOT NULL, language TEXT NOT NULL, "
+                   "category TEXT NOT NULL, item_id INTEGER NOT NULL, weight INTEGER NOT NULL, "
+                   "PRIMARY KEY (tag, language, category, item_id)) WITHOUT ROWID")
+        db.commit()
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            import sqlite3
+            db = self._local.db = sqlite3.connect(self.path, timeout=self.timeout)
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    # Indexes parsed sections under the mood tags of `texts` (the user's words and the analyzed
+    # mood), in one transaction. Sections outside the catalog and texts without a mood are skipped.
+    def add(self, sections, language, *texts):
+        tags = mood_tags(" ".join(text for text in texts if text))
+        rows = [(category_map[section].key, item) for section, items in sections.items()
+                if section in self.sections for item in items if item.title]
+        if not tags or not rows:
+            return 0
+        try:
+            db = self._connection()
+            with db:
+                for key, item in rows:
+                    norm = _normalize(item.title, item.subtitle)
+                    db.execute("INSERT INTO catalog_items (category, language, norm, title, subtitle, url, extra) "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (category, language, norm) DO UPDATE SET "
+                               "url = excluded.url WHERE excluded.url NOT IN ('', 'N/A')",
+                               (key, language, norm, item.title, item.subtitle, item.url, item.extra))
+                    item_id = db.execute("SELECT id FROM catalog_items WHERE category = ? AND language = ? AND norm = ?",
+                                         (key, language, norm)).fetchone()[0]
+                    db.executemany("INSERT INTO catalog_tags (tag, language, category, item_id, weight) "
+                                   "VALUES (?, ?, ?, ?, 1) ON CONFLICT (tag, language, category, item_id) "
+                                   "DO UPDATE SET weight = weight + 1",
+                                   [(tag, language, key, item_id) for tag in tags])
+        except Exception:
+            self._count(errors=1)
+            return 0
+        self._count(added=len(rows))
+        return len(rows)
+
+    # -> {section: items} for the requested catalog sections that have at least a full tab of
+    # items for the mood of `text` in this language, best first, with up to `candidates` items
+    # per section for reranking. Everything else is a gap for the model to fill.
+    def lookup(self, text, language, sections, candidates=0):
+        wanted = {category_map[section].key: section for section in sections if section in self.sections}
+        tags = mood_tags(text)
+        found = {}
+        if wanted and tags:
+            try:
+                # Best items per category are picked in SQL, so only a tab's worth of rows come back
+                rows = self._connection().execute(
+                    f"SELECT r.category, i.title, i.subtitle, i.url, i.extra FROM ("
+                    f"SELECT category, item_id, ROW_NUMBER() OVER ("
+                    f"PARTITION BY category ORDER BY SUM(weight) DESC, item_id) AS rank FROM catalog_tags "
+                    f"WHERE tag IN ({','.join('?' * len(tags))}) AND language = ? "
+                    f"AND category IN ({','.join('?' * len(wanted))}) GROUP BY category, item_id"
+                    f") r JOIN catalog_items i ON i.id = r.item_id WHERE r.rank <= ? ORDER BY r.category, r.rank",
+                    (*tags, language, *wanted, max([candidates] + [category_map[s].items for s in wanted.values()])))
+                for key, *fields in rows:
+                    items = found.setdefault(wanted[key], [])
+                    if len(items) < max(category_map[wanted[key]].items, candidates):
+                        items.append(RecommendationItem(*(field or "" for field in fields)))
+            except Exception:
+                self._count(errors=1)
+                found = {}
+        found = {section: found[section] for section in sections
+                 if len(found.get(section, ())) >= category_map[section].items}
+        self._count(lookups=1, served=len(found), gaps=len(sections) - len(found))
+        return found
+
+    def stats(self):
+        try:
+            db = self._connection()
+            items = db.execute("SELECT COUNT(*) FROM catalog_items").fetchone()[0]
+            tags = db.execute("SELECT COUNT(*) FROM catalog_tags").fetchone()[0]
+        except Exception:
+            items = tags = None
+        with self._lock:
+            requested = self.served + self.gaps
+            return {
+                "mode": "retrieve" if self.retrieve else "record",
+                "items": items,
+                "index_entries": tags,
+                "added": self.added,
+                "lookups": self.lookups,
+                "sections_served": self.served,
+                "sections_generated": self.gaps,
+                "errors": self.errors,
+                "serve_rate": round(self.served / requested, 3) if requested else 0.0,
+            }
+
+# The catalog CATALOG_MODE asks for ("record" or "retrieve"), or None when it is "off"
+def open_catalog(mode=CATALOG_MODE, path=CATALOG_PATH):
+    if mode not in ("record", "retrieve"):
+        return None
+    return Catalog(path, retrieve=mode == "retrieve")
@@ -0,0 +1,69 @@
+# Category registry: the one description of every recommendation category. The prompts and
+# token budgets (moodx.pipeline), the parser tables (moodx.parser) and the tabs (moodx.ui) are
+# all generated from it, so adding, reordering or switching off a category is a one-line change.
+from collections import namedtuple
+
+# header     - section header the model writes and the parser splits on
+# key        - JSON key of the category in JSON output mode
+# columns    - per " - " separated column of the markdown line, in order: its JSON field name,
+#              the RecommendationItem field it fills and its placeholder in the prompt
+# items      - number of recommendations requested
+# label      - text of the item links (None = the category has no links)
+# tab_name   - tab title in the UI
+# max_tokens - output token budget for the category when it is requested on its own
+# enabled    - disabled categories are never requested or rendered
+Category = namedtuple("Category", ["header", "key", "columns", "items", "label", "tab_name", "max_tokens",
+                                   "enabled"])
+
+# In tab order, which is also the order the categories are asked for, so in stream mode the
+# first tab is the first one filled
+categories = [
+    Category("🍿 Cine Magic", "cine_magic",
+             (("title", "title", "Movie/Show Title"), ("service", "subtitle", "Streaming Service"),
+              ("url", "url", "URL")),
+             10, "Watch Now", "🍿 Cine Magic", 550, True),
+    Category("🎵 Songs", "songs",
+             (("title", "title", "Song Title"), ("artist", "subtitle", "Artist"), ("url", "url", "URL")),
+             10, "Listen Now", "🎵 Jam Sessions", 550, True),
+    Category("🛍️ Products", "products",
+             (("name", "title", "Product/App Name"), ("url", "url", "URL"), ("reason", "extra", "Reason")),
+             10, "View Product", "🛒 Hot Buys", 650, True),
+    Category("🎮 Games", "games",
+             (("title", "title", "Game Title"), ("platform", "subtitle", "Platform")),
+             10, None, "🎮 Game On", 300, True),
+    Category("📖 Articles", "articles",
+             (("title", "title", "Article Title"), ("url", "url", "URL")),
+             10, "Read More", "📚 Thoughtful Reads", 450, True),
+    Category("🎥 Videos", "videos",
+             (("title", "title", "Video Title"), ("url", "url", "YouTube URL")),
+             10, "Watch Now", "📹 Video Vibes", 450, True),
+    Category("💞 Connect", "connect",
+             (("idea", "title", "Social/Dating Idea"), ("url", "url", "URL")),
+             10, "Explore", "💞 Social Sparks", 450, True),
+    Category("✈️ Travel", "travel",
+             (("destination", "title", "Destination"), ("url", "url", "URL")),
+             10, "Discover", "✈️ Wanderlust Escapes", 400, True),
+    Category("🍽️ Food", "food",
+             (("meal", "title", "Meal Idea"), ("url", "url", "URL")),
+             10, "Explore Recipe", "🍽️ Mood Meals", 400, True),
+    # Overlaps Cine Magic and never had a tab, so it is not worth its output tokens
+    Category("🎬 Movies", "movies",
+             (("title", "title", "Movie Title"), ("service", "subtitle", "Streaming Service"),
+              ("details", "extra", "Trending/Popularity/Rating Details"), ("url", "url", "URL")),
+             10, "Watch Now", "🎬 Movie Night", 700, False),
+]
+
+category_map = {category.header: category for category in categories}
+
+# Headers of the categories to request and render, in tab order. Products follow the user's
+# "include_products" preference.
+def enabled_sections(preferences=None):
+    include_products = (preferences or {}).get("include_products", True)
+    return [
+        category.header for category in categories
+        if category.enabled and (include_products or category.header != "🛍️ Products")
+    ]
+
+# "[Song Title] - [Artist] - [URL]"
+def item_format(category):
+    return " - ".join(f"[{placeholder}]" for _, _, placeholder in category.columns)
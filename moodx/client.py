@@ -0,0 +1,774 @@
+# Groq chat-completions client and the process-wide plumbing around it: pooled transport,
+# rate limiting, request coalescing and adaptive token budgets. `requests` is imported on first
+# use, so importing this module does not pay for the HTTP stack.
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from moodx.config import (
+    ADAPTIVE_MAX_TOKENS,
+    GROQ_BACKOFF_BASE,
+    GROQ_BACKOFF_MAX,
+    GROQ_BASE_URL,
+    GROQ_COALESCE,
+    GROQ_CONNECT_TIMEOUT,
+    GROQ_HEDGE,
+    GROQ_MAX_RETRIES,
+    GROQ_POOL_SIZE,
+    GROQ_READ_TIMEOUT,
+    GROQ_RPM,
+    GROQ_TPM,
+    HEDGE_BUDGET,
+    HEDGE_CALL_TYPES,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    MODEL_COOLDOWN,
+    MODEL_NAME,
+    MODEL_PRICES,
+    MODEL_ROUTES,
+    MODEL_ROUTING,
+    MODEL_PROBE_EVERY,
+    MODEL_SLOW_FACTOR,
+    SMALL_MODEL_NAME,
+    TOKEN_BUDGET_HEADROOM,
+    TOKEN_BUDGET_MIN_SAMPLES,
+    TOKEN_BUDGET_WINDOW,
+)
+from moodx.metrics import metrics as default_metrics
+
+# Pooled keep-alive HTTP transport shared by every ChatGroq call
+class HTTPTransport:
+    def __init__(self, pool_size=GROQ_POOL_SIZE, connect_timeout=GROQ_CONNECT_TIMEOUT,
+                 read_timeout=GROQ_READ_TIMEOUT):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._errors = 0
+
+    def post(self, url, headers, json, timeout=None, stream=False):
+        import requests
+        try:
+            return self.session.post(url, headers=headers, json=json, timeout=timeout or self.timeout,
+                                     stream=stream)
+        except requests.RequestException:
+            with self._lock:
+                self._errors += 1
+            raise
+
+    # urllib3 counts every request and every new socket per host pool; the difference is
+    # the number of requests that were served on an already open keep-alive connection.
+    def stats(self):
+        requests_sent = 0
+        connections_opened = 0
+        for adapter in set(self.session.adapters.values()):
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                requests_sent += pool.num_requests
+                connections_opened += pool.num_connections
+        return {
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "connections_reused": max(0, requests_sent - connections_opened),
+            "errors": self._errors,
+        }
+
+# Groq reset durations look like "59.6s", "2m59.56s" or "120ms"
+def parse_duration(value):
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    return sum(float(amount) * units[unit] for amount, unit in parts) if parts else None
+
+def backoff_delay(attempt):
+    return random.uniform(0, min(GROQ_BACKOFF_MAX, GROQ_BACKOFF_BASE * 2 ** attempt))
+
+# Process-wide token bucket over requests and tokens per minute. Callers queue in acquire()
+# until both buckets have room instead of being sent upstream to collect a 429. The buckets are
+# corrected from the x-ratelimit-* response headers, and a 429 pauses every caller for the
+# retry-after period.
+class RateLimiter:
+    def __init__(self, rpm=GROQ_RPM, tpm=GROQ_TPM):
+        # name -> [capacity per minute (0 = unlimited), current level]
+        self._buckets = {"requests": [rpm, rpm], "tokens": [tpm, tpm]}
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self.queued = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        for bucket in self._buckets.values():
+            if bucket[0]:
+                bucket[1] = min(bucket[0], bucket[1] + bucket[0] * elapsed / 60)
+
+    # Blocks until one request and `tokens` tokens are available, then takes them.
+    # A request larger than the whole token bucket waits for a full bucket.
+    def acquire(self, tokens):
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                needed = {"requests": 1, "tokens": tokens}
+                delay = self._paused_until - now
+                for name, (capacity, level) in self._buckets.items():
+                    if capacity:
+                        amount = min(needed[name], capacity)
+                        if level < amount:
+                            delay = max(delay, (amount - level) * 60 / capacity)
+                if delay <= 0:
+                    break
+                self._cond.wait(delay)
+            for name, bucket in self._buckets.items():
+                if bucket[0]:
+                    bucket[1] -= min(needed[name], bucket[0])
+            waited = time.monotonic() - start
+            if waited > 0.001:
+                self.queued += 1
+                self.wait_seconds += waited
+        return tokens
+
+    # Returns the unused part of a token reservation once the real usage is known
+    def release(self, reserved, used):
+        with self._cond:
+            bucket = self._buckets["tokens"]
+            if bucket[0]:
+                bucket[1] = min(bucket[0], bucket[1] + max(0, reserved - used))
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    # A 429: counted, and every caller waits out the pause
+    def throttle(self, seconds):
+        with self._cond:
+            self.throttled += 1
+        self.pause(seconds)
+
+    def retried(self):
+        with self._cond:
+            self.retries += 1
+
+    # x-ratelimit-limit-tokens is per minute and resizes the token bucket; the remaining counts
+    # only ever lower our levels. x-ratelimit-*-requests is a daily quota, so running out of it
+    # pauses callers until its reset time.
+    def update(self, headers):
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        with self._cond:
+            tokens = self._buckets["tokens"]
+            if limit_tokens and limit_tokens.isdigit():
+                if not tokens[0]:
+                    # First time we learn the limit: start from a full bucket
+                    tokens[1] = int(limit_tokens)
+                tokens[0] = int(limit_tokens)
+            if tokens[0] and remaining_tokens and remaining_tokens.isdigit():
+                tokens[1] = min(tokens[1], int(remaining_tokens))
+        if remaining_requests == "0":
+            self.pause(parse_duration(headers.get("x-ratelimit-reset-requests")) or 60)
+
+    def stats(self):
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                "requests_available": round(self._buckets["requests"][1], 1) if self._buckets["requests"][0] else None,
+                "tokens_available": round(self._buckets["tokens"][1]) if self._buckets["tokens"][0] else None,
+                "queued": self.queued,
+                "wait_seconds": round(self.wait_seconds, 2),
+                "throttled": self.throttled,
+                "retries": self.retries,
+            }
+
+# In-flight request deduplication: the first caller for a key runs the request, callers that
+# arrive with the same key while it is running wait for and share its result (or exception).
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return call.result()
+        try:
+            call.set_result(fn())
+        except BaseException as e:
+            call.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return call.result()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "upstream_calls": self.leaders, "coalesced": self.coalesced}
+
+# Rolling window of completion-token usage per call type ("mood", "recommendations", "agent", ...)
+# used to size max_tokens from what calls actually need. A reply cut off by the cap
+# (finish_reason "length") is recorded as if it had needed half again as many tokens, so the
+# cap climbs back towards the call site's ceiling after truncations.
+class TokenBudget:
+    def __init__(self, window=TOKEN_BUDGET_WINDOW, min_samples=TOKEN_BUDGET_MIN_SAMPLES,
+                 headroom=TOKEN_BUDGET_HEADROOM, floor=32):
+        self.window = window
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self.floor = floor
+        self._samples = {}
+        self._calls = {}
+        self._truncated = {}
+        self._ceilings = {}
+        self._lock = threading.Lock()
+
+    def record(self, call_type, completion_tokens, finish_reason):
+        truncated = finish_reason == "length"
+        with self._lock:
+            self._calls[call_type] = self._calls.get(call_type, 0) + 1
+            if truncated:
+                self._truncated[call_type] = self._truncated.get(call_type, 0) + 1
+            if completion_tokens is not None:
+                samples = self._samples.setdefault(call_type, deque(maxlen=self.window))
+                samples.append(int(completion_tokens * 1.5) if truncated else completion_tokens)
+
+    def percentile(self, call_type, q):
+        with self._lock:
+            samples = sorted(self._samples.get(call_type, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def cap(self, call_type, ceiling):
+        with self._lock:
+            self._ceilings[call_type] = ceiling
+            enough = len(self._samples.get(call_type, ())) >= self.min_samples
+        if not enough:
+            return ceiling
+        return max(self.floor, min(ceiling, int(self.percentile(call_type, 0.99) * (1 + self.headroom))))
+
+    def stats(self):
+        with self._lock:
+            call_types = list(self._calls)
+        stats = {}
+        for call_type in call_types:
+            ceiling = self._ceilings.get(call_type)
+            stats[call_type] = {
+                "calls": self._calls.get(call_type, 0),
+                "truncated": self._truncated.get(call_type, 0),
+                "p50": self.percentile(call_type, 0.5),
+                "p99": self.percentile(call_type, 0.99),
+                "cap": self.cap(call_type, ceiling) if ceiling else None,
+            }
+        return stats
+
+# "a=x,b=y" setting -> {"a": "x", "b": "y"}
+def parse_mapping(value):
+    mapping = {}
+    for entry in value.split(","):
+        key, sep, item = entry.partition("=")
+        if sep and key.strip():
+            mapping[key.strip()] = item.strip()
+    return mapping
+
+# Sends each call type to a model tier and keeps per-model latency, token and cost stats.
+# candidates() returns the model to try first and the other tier's model to retry a failure on.
+# The preferred tier is skipped while it cools down after an error, or while its recent latency
+# per completion token (an EWMA, so it tracks queueing upstream) is slow_factor times the other's.
+# Latency is kept per model and call type: a 20-token mood reply is mostly time to first token
+# and cannot be compared with a 2000-token recommendation. A tier skipped for being slow still
+# gets every probe_every-th call of that type, so its latency does not go stale.
+class ModelRouter:
+    def __init__(self, large_model=MODEL_NAME, small_model=SMALL_MODEL_NAME, routes=MODEL_ROUTES,
+                 cooldown=MODEL_COOLDOWN, slow_factor=MODEL_SLOW_FACTOR, prices=MODEL_PRICES,
+                 metrics=None, alpha=0.2, probe_every=MODEL_PROBE_EVERY):
+        self.tiers = {"large": large_model, "small": small_model}
+        self.routes = parse_mapping(routes) if isinstance(routes, str) else dict(routes)
+        self.cooldown = cooldown
+        self.slow_factor = slow_factor
+        self.alpha = alpha
+        self.probe_every = probe_every
+        self.prices = {}
+        for model, price in (parse_mapping(prices) if isinstance(prices, str) else prices).items():
+            prompt_price, _, completion_price = str(price).partition(":")
+            self.prices[model] = (float(prompt_price), float(completion_price or prompt_price))
+        self.metrics = metrics or default_metrics
+        self._lock = threading.Lock()
+        self._per_token = {}
+        self._skipped = {}
+        self._cooling_until = {}
+        self._stats = {}
+
+    def tier(self, call_type):
+        if not call_type:
+            return "large"
+        tier = self.routes.get(call_type) or self.routes.get(call_type.split(":", 1)[0])
+        return tier if tier in self.tiers else "large"
+
+    def candidates(self, call_type):
+        preferred = self.tiers[self.tier(call_type)]
+        other = next((model for model in self.tiers.values() if model != preferred), None)
+        if other is None:
+            return [preferred]
+        now = time.monotonic()
+        with self._lock:
+            cooling = self._cooling_until.get(preferred, 0) > now
+            if self._cooling_until.get(other, 0) > now:
+                return [preferred, other]
+            if cooling:
+                return [other, preferred]
+            preferred_latency = self._per_token.get((preferred, call_type))
+            other_latency = self._per_token.get((other, call_type))
+            if preferred_latency is None or other_latency is None or \
+                    preferred_latency <= self.slow_factor * other_latency:
+                self._skipped.pop(call_type, None)
+                return [preferred, other]
+            skipped = self._skipped[call_type] = self._skipped.get(call_type, 0) + 1
+            if self.probe_every and skipped % self.probe_every == 0:
+                return [preferred, other]
+        return [other, preferred]
+
+    def _model_stats(self, model):
+        return self._stats.setdefault(model, {
+            "calls": 0, "errors": 0, "fallbacks": 0, "seconds": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0,
+        })
+
+    def record(self, model, seconds, usage, fallback=False, call_type=None):
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        completion_tokens = usage.get("completion_tokens") or 0
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+        per_token = seconds / max(1, completion_tokens)
+        with self._lock:
+            stats = self._model_stats(model)
+            stats["calls"] += 1
+            stats["fallbacks"] += fallback
+            stats["seconds"] += seconds
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost_usd"] += cost
+            previous = self._per_token.get((model, call_type))
+            self._per_token[model, call_type] = per_token if previous is None else \
+                previous + self.alpha * (per_token - previous)
+        self.metrics.observe("moodx_model_request_seconds", seconds, model=model)
+        if cost:
+            self.metrics.inc("moodx_model_cost_usd_total", cost, model=model)
+        if fallback:
+            self.metrics.inc("moodx_model_fallbacks_total", model=model)
+
+    def failed(self, model):
+        with self._lock:
+            self._model_stats(model)["errors"] += 1
+            self._cooling_until[model] = time.monotonic() + self.cooldown
+        self.metrics.inc("moodx_model_errors_total", model=model)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for model, totals in self._stats.items():
+                stats[model] = dict(totals, seconds=round(totals["seconds"], 3),
+                                    cost_usd=round(totals["cost_usd"], 6),
+                                    mean_seconds=round(totals["seconds"] / totals["calls"], 3)
+                                    if totals["calls"] else None,
+                                    ms_per_token={call_type or "untyped": round(latency * 1e3, 3)
+                                                  for (name, call_type), latency in self._per_token.items()
+                                                  if name == model},
+                                    cooling=self._cooling_until.get(model, 0) > now)
+        return stats
+
+# Runs fn() on a new daemon thread; returns a Future of its result
+def _spawn(fn):
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+# Hedged requests for the call types in call_types. run() starts the attempt and, if it has not
+# finished after the percentile of recent latencies for its call type, starts a second one; the
+# first to succeed is returned and discard() gets the other's result if it succeeds as well.
+# Hedges are only sent while they stay within `budget` of the eligible calls.
+class HedgePolicy:
+    def __init__(self, call_types=HEDGE_CALL_TYPES if GROQ_HEDGE else "", percentile=HEDGE_PERCENTILE,
+                 budget=HEDGE_BUDGET, min_samples=HEDGE_MIN_SAMPLES, window=200):
+        if isinstance(call_types, str):
+            call_types = [call_type.strip() for call_type in call_types.split(",")]
+        self.call_types = {call_type for call_type in call_types if call_type}
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    # Seconds to wait before hedging, or None while there is too little history
+    def delay(self, key):
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples or len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+
+    def _record(self, key, seconds):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def _take_budget(self):
+        with self._lock:
+            if self.hedged + 1 > self.budget * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    # Streamed and unstreamed calls of a type keep separate latency histories, since a streamed
+    # attempt finishes at its first token
+    def run(self, call_type, attempt, discard, stream=False):
+        if call_type not in self.call_types:
+            return attempt()
+        key = (call_type, stream)
+        started = time.perf_counter()
+        delay = self.delay(key)
+        with self._lock:
+            self.calls += 1
+        if delay is None:
+            result = attempt()
+            self._record(key, time.perf_counter() - started)
+            return result
+        futures = [_spawn(attempt)]
+        done, _ = wait(futures, timeout=delay)
+        if not done and self._take_budget():
+            futures.append(_spawn(attempt))
+        winner = None
+        pending = set(futures)
+        while winner is None and pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.exception() is None), None)
+        if winner is None:
+            return futures[0].result()
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(lambda f: f.exception() is None and discard(f.result()))
+        self._record(key, time.perf_counter() - started)
+        if winner is not futures[0]:
+            with self._lock:
+                self.hedge_wins += 1
+        return winner.result()
+
+    def stats(self):
+        with self._lock:
+            keys = list(self._samples)
+            stats = {"calls": self.calls, "hedged": self.hedged, "hedge_wins": self.hedge_wins,
+                     "hedge_rate": round(self.hedged / self.calls, 4) if self.calls else 0.0}
+        delays = {}
+        for call_type, stream in keys:
+            delay = self.delay((call_type, stream))
+            delays[f"{call_type} (stream)" if stream else call_type] = round(delay, 3) if delay is not None else None
+        stats["hedge_after_seconds"] = delays
+        return stats
+
+# Groq API Client
+class ChatGroq:
+    def __init__(self, api_key, model_name, transport=None, budget=None, limiter=None, metrics=None,
+                 router=None, hedge=None):
+        self.api_key = api_key
+        self.model = model_name
+        self.endpoint = f"{GROQ_BASE_URL}/chat/completions"
+        self.transport = transport or HTTPTransport()
+        self.budget = budget or TokenBudget()
+        self.limiter = limiter or RateLimiter()
+        self.singleflight = SingleFlight()
+        self.metrics = metrics or default_metrics
+        # Without a router every call goes to model_name
+        self.router = router or (ModelRouter(model_name, metrics=self.metrics) if MODEL_ROUTING else None)
+        self.hedge = hedge or HedgePolicy()
+        # Per thread, as every Streamlit session and batch worker shares the client
+        self._reply = threading.local()
+        # Built once and reused for every call
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    # An optional system message goes ahead of the prompt; keeping it identical across calls
+    # lets the per-request part stay small (see moodx.prompts)
+    def _payload(self, prompt, max_tokens, json_mode=False, model=None, system=None):
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": 0.3,
+            "max_tokens": max_tokens
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    # Models to try for a call type, in order
+    def _models(self, call_type):
+        return self.router.candidates(call_type) if self.router else [self.model]
+
+    # With a call_type, max_tokens is the ceiling for that kind of call and the actual cap comes
+    # from its usage history; the reply's usage block feeds that history.
+    def _max_tokens(self, call_type, max_tokens):
+        if call_type and ADAPTIVE_MAX_TOKENS:
+            return self.budget.cap(call_type, max_tokens)
+        return max_tokens
+
+    # Sends the payload once the rate limiter lets it through, retrying 429s, 5xx and connection
+    # failures with backoff. Returns (response, reserved tokens); the response may still be an
+    # error if the retries ran out or the status is not retryable. Every attempt reserves tokens
+    # and a failed one gives them all back, so a retry storm does not drain the bucket.
+    def _post(self, payload, timeout=None, stream=False):
+        import requests
+        # Rough reservation: ~4 characters per prompt token plus the full completion cap
+        reserved = sum(len(message["content"]) for message in payload["messages"]) // 4 + payload["max_tokens"]
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            self.limiter.acquire(reserved)
+            last_attempt = attempt == GROQ_MAX_RETRIES
+            try:
+                response = self.transport.post(self.endpoint, headers=self.headers, json=payload,
+                                               timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                self.limiter.release(reserved, 0)
+                if last_attempt:
+                    raise
+                self.limiter.retried()
+                time.sleep(backoff_delay(attempt))
+                continue
+            self.limiter.update(response.headers)
+            if last_attempt or (response.status_code != 429 and response.status_code < 500):
+                return response, reserved
+            self.limiter.retried()
+            self.limiter.release(reserved, 0)
+            delay = parse_duration(response.headers.get("retry-after")) or backoff_delay(attempt)
+            response.close()
+            if response.status_code == 429:
+                # Everyone queues behind the pause, not just this caller
+                self.limiter.throttle(delay + random.uniform(0, GROQ_BACKOFF_BASE))
+            else:
+                time.sleep(delay)
+
+    # Runs attempt() with payload["model"] set to each model in turn until one succeeds; every
+    # failure is reported to the router, so the failing tier cools down for later calls too.
+    # Returns (result, model, whether it was a fallback).
+    def _with_fallback(self, payload, models, attempt):
+        for i, model in enumerate(models):
+            payload["model"] = model
+            try:
+                return attempt(), model, i > 0
+            except Exception:
+                if self.router:
+                    self.router.failed(model)
+                if i == len(models) - 1:
+                    raise
+
+    # finish_reason of the last reply this thread got from generate() or a finished
+    # generate_stream(); "length" means the reply was cut off at its max_tokens
+    def finish_reason(self):
+        return getattr(self._reply, "finish_reason", None)
+
+    # Identical payloads (model, messages, max_tokens, temperature, format) that overlap in time,
+    # e.g. several sessions submitting the default text, go upstream once.
+    def generate(self, prompt, max_tokens=6000, timeout=None, json_mode=False, call_type=None, system=None):
+        self._reply.finish_reason = None
+        models = self._models(call_type)
+        payload = self._payload(prompt, self._max_tokens(call_type, max_tokens), json_mode, models[0], system)
+        if not GROQ_COALESCE:
+            content, self._reply.finish_reason = self._generate(payload, models, timeout, call_type)
+            return content
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+        content, self._reply.finish_reason = self.singleflight.do(
+            key, lambda: self._generate(payload, models, timeout, call_type))
+        return content
+
+    def _complete(self, payload, timeout):
+        response, reserved = self._post(payload, timeout)
+        if response.status_code != 200:
+            self.limiter.release(reserved, 0)
+            raise Exception(f"API Error: {response.status_code} - {response.text}")
+        body = response.json()
+        return body["choices"][0], body.get("usage") or {}, reserved
+
+    # A hedge's losing reply: give back its unused token reservation
+    def _discard_completion(self, result):
+        _, usage, reserved = result
+        self.limiter.release(reserved, usage.get("total_tokens", reserved))
+
+    # Unstreamed calls that may be hedged are sent as streams and read to the end, so a losing
+    # attempt is closed (which stops its completion upstream) rather than left to finish. JSON mode
+    # cannot be streamed, so a hedged JSON call's loser still runs to the end.
+    def _streams_hedge(self, payload, call_type):
+        return call_type in self.hedge.call_types and "response_format" not in payload
+
+    # A stream from _start_stream() read to the end -> (content, usage, finish_reason); the
+    # stream itself releases the reservation and records the token budget
+    def _complete_streamed(self, payload, timeout, call_type):
+        payload = dict(payload, stream=True)
+        first, stream = self.hedge.run(call_type, lambda: self._start_stream(payload, timeout, call_type),
+                                       self._discard_stream, stream=True)
+        parts = [first] if first else []
+        while True:
+            try:
+                parts.append(next(stream))
+            except StopIteration as done:
+                usage, finish_reason = done.value or ({}, None)
+                return "".join(parts), usage, finish_reason
+
+    def _generate(self, payload, models, timeout, call_type):
+        started = time.perf_counter()
+        streamed = self._streams_hedge(payload, call_type)
+        try:
+            if streamed:
+                (content, usage, finish_reason), model, fallback = self._with_fallback(
+                    payload, models, lambda: self._complete_streamed(payload, timeout, call_type))
+            else:
+                (choice, usage, reserved), model, fallback = self._with_fallback(
+                    payload, models, lambda: self.hedge.run(call_type, lambda: self._complete(payload, timeout),
+                                                            self._discard_completion))
+                content, finish_reason = choice["message"]["content"], choice.get("finish_reason")
+        except Exception:
+            self.metrics.inc("moodx_llm_errors_total", call_type=call_type or "untyped")
+            raise
+        if not streamed:
+            self.limiter.release(reserved, usage.get("total_tokens", reserved))
+            if call_type:
+                self.budget.record(call_type, usage.get("completion_tokens"), finish_reason)
+        seconds = time.perf_counter() - started
+        self.metrics.record_call(call_type, seconds, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        if self.router:
+            self.router.record(model, seconds, usage, fallback, call_type)
+        return content, finish_reason
+
+    # Server-sent events variant of generate(): yields content deltas as the model produces them.
+    # The read timeout applies between chunks, not to the whole completion. Only a failure before
+    # the first chunk falls back to the other tier; later ones would repeat text already shown.
+    def generate_stream(self, prompt, max_tokens=6000, timeout=None, call_type=None, system=None):
+        self._reply.finish_reason = None
+        models = self._models(call_type)
+        payload = self._payload(prompt, self._max_tokens(call_type, max_tokens), model=models[0], system=system)
+        payload["stream"] = True
+        started = time.perf_counter()
+        try:
+            (first, stream), model, fallback = self._with_fallback(
+                payload, models, lambda: self.hedge.run(call_type, lambda: self._start_stream(payload, timeout, call_type),
+                                                        self._discard_stream, stream=True))
+            try:
+                if first:
+                    yield first
+                usage, self._reply.finish_reason = (yield from stream) or ({}, None)
+            except Exception:
+                if self.router:
+                    self.router.failed(model)
+                raise
+        except Exception:
+            self.metrics.inc("moodx_llm_errors_total", call_type=call_type or "untyped")
+            raise
+        seconds = time.perf_counter() - started
+        self.metrics.record_call(call_type, seconds, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+        if self.router:
+            self.router.record(model, seconds, usage, fallback, call_type)
+
+    def _open_stream(self, payload, timeout):
+        response, reserved = self._post(payload, timeout, stream=True)
+        if response.status_code != 200:
+            self.limiter.release(reserved, 0)
+            with response:
+                raise Exception(f"API Error: {response.status_code} - {response.text}")
+        return response, reserved
+
+    # Opens the stream and reads up to its first content delta, so hedged attempts race on the
+    # time to first token. Returns (first delta or None, generator over the rest); closing the
+    # generator drops the connection, which stops the completion upstream.
+    def _start_stream(self, payload, timeout, call_type):
+        response, reserved = self._open_stream(payload, timeout)
+        stream = self._stream(response, reserved, call_type, reserved - payload["max_tokens"])
+        return next(stream, None), stream
+
+    def _discard_stream(self, result):
+        result[1].close()
+
+    # Body of generate_stream(); returns the reply's usage block and finish_reason once the
+    # stream is done. The reservation is released however the stream ends, including when the
+    # generator is closed early (a hedge's losing stream); without a usage block the tokens used
+    # are estimated from the prompt estimate and the text received so far.
+    def _stream(self, response, reserved, call_type, prompt_tokens=0):
+        usage = None
+        finish_reason = None
+        received = 0
+        try:
+            with response:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    if "error" in chunk:
+                        raise Exception(f"API Error: {chunk['error']}")
+                    # Groq reports usage on the final chunk under x_groq; OpenAI-style servers at the top level
+                    usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                    choices = chunk.get("choices") or [{}]
+                    finish_reason = choices[0].get("finish_reason") or finish_reason
+                    content = choices[0].get("delta", {}).get("content")
+                    if content:
+                        received += len(content)
+                        yield content
+        finally:
+            used = (usage or {}).get("total_tokens")
+            self.limiter.release(reserved, prompt_tokens + received // 4 if used is None else used)
+        usage = usage or {}
+        if call_type:
+            self.budget.record(call_type, usage.get("completion_tokens"), finish_reason)
+        return usage, finish_reason
+
+# Explicit construction for scripts and workers; the API key defaults to GROQ_API_KEY
+def create_client(api_key=None, model_name=MODEL_NAME, transport=None, budget=None, limiter=None, metrics=None,
+                  router=None, hedge=None):
+    api_key = api_key or os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY is not set")
+    return ChatGroq(api_key, model_name, transport, budget, limiter, metrics, router, hedge)
@@ -0,0 +1,101 @@
+# Core settings, read from the environment when moodx.config is first imported. Front-ends
+# that use a .env file call load_dotenv() before importing anything from moodx.
+import os
+
+MODEL_NAME = "llama3-70b-8192"
+# Model tiering: call types listed in MODEL_ROUTES ("call_type=tier,..."; "category" matches every
+# "category:<section>") go to that tier, everything else to the large MODEL_NAME. A failed call is
+# retried once on the other tier, which also serves a tier's calls for MODEL_COOLDOWN seconds
+# after an error or while it is MODEL_SLOW_FACTOR times slower per completion token on the same
+# call type; every MODEL_PROBE_EVERY-th of those calls still goes to the slow tier to re-measure it.
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "1") == "1"
+SMALL_MODEL_NAME = os.getenv("SMALL_MODEL_NAME", "llama3-8b-8192")
+MODEL_ROUTES = os.getenv("MODEL_ROUTES", "mood=small,agent=small,agents_batch=small,catalog_rerank=small")
+MODEL_COOLDOWN = float(os.getenv("MODEL_COOLDOWN", "30"))
+MODEL_SLOW_FACTOR = float(os.getenv("MODEL_SLOW_FACTOR", "2"))
+MODEL_PROBE_EVERY = int(os.getenv("MODEL_PROBE_EVERY", "20"))
+# USD per million prompt:completion tokens, for the per-model cost estimate
+MODEL_PRICES = os.getenv("MODEL_PRICES", "llama3-8b-8192=0.05:0.08,llama3-70b-8192=0.59:0.79")
+# OpenAI-compatible API root; point it at benchmarks/mock_groq.py for local load tests
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+# Maximum number of agent prompts in flight at once
+AGENT_CONCURRENCY = int(os.getenv("AGENT_CONCURRENCY", "8"))
+# HTTP transport tuning: keep-alive pool size and (connect, read) timeouts in seconds
+GROQ_POOL_SIZE = int(os.getenv("GROQ_POOL_SIZE", "16"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_READ_TIMEOUT = float(os.getenv("GROQ_READ_TIMEOUT", "60"))
+# Client-side rate limiting: requests and tokens per minute, and retries with jittered exponential
+# backoff on 429/5xx. The token limit is learned from the x-ratelimit-* headers when left at 0;
+# the request limit is not (the API only reports a daily request quota), so GROQ_RPM is off by
+# default. It is one budget per process, shared by every session: set it to the account's
+# requests-per-minute divided by the number of app/batch processes using the key.
+GROQ_RPM = int(os.getenv("GROQ_RPM", "0"))
+GROQ_TPM = int(os.getenv("GROQ_TPM", "0"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+GROQ_BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "0.5"))
+GROQ_BACKOFF_MAX = float(os.getenv("GROQ_BACKOFF_MAX", "20"))
+# Share one upstream request between concurrent identical generate() calls
+GROQ_COALESCE = os.getenv("GROQ_COALESCE", "1") == "1"
+# Hedged requests (opt-in): a call of one of HEDGE_CALL_TYPES still waiting after the
+# HEDGE_PERCENTILE of its recent latencies (time to first token when streamed) gets a duplicate
+# request, and the first to answer wins. At most HEDGE_BUDGET of those calls are hedged, and only
+# once HEDGE_MIN_SAMPLES latencies have been seen. Unstreamed calls are hedged as streams so the
+# losing attempt can be closed; JSON-mode calls (e.g. recommendations_json) cannot be streamed,
+# so their losing attempt runs to the end and is paid for in full, and they are left out by default.
+GROQ_HEDGE = os.getenv("GROQ_HEDGE", "0") == "1"
+HEDGE_CALL_TYPES = os.getenv("HEDGE_CALL_TYPES", "recommendations")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_BUDGET = float(os.getenv("HEDGE_BUDGET", "0.05"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+# Adaptive max_tokens: once a call type has TOKEN_BUDGET_MIN_SAMPLES observations, its cap becomes
+# the p99 of recent completion tokens plus TOKEN_BUDGET_HEADROOM, never above the call site's value
+ADAPTIVE_MAX_TOKENS = os.getenv("ADAPTIVE_MAX_TOKENS", "1") == "1"
+TOKEN_BUDGET_WINDOW = int(os.getenv("TOKEN_BUDGET_WINDOW", "200"))
+TOKEN_BUDGET_MIN_SAMPLES = int(os.getenv("TOKEN_BUDGET_MIN_SAMPLES", "20"))
+TOKEN_BUDGET_HEADROOM = float(os.getenv("TOKEN_BUDGET_HEADROOM", "0.2"))
+# Maximum number of per-category prompts in flight at once in "split" mode
+CATEGORY_CONCURRENCY = int(os.getenv("CATEGORY_CONCURRENCY", "10"))
+# How the main recommendations are requested:
+#   "single" - one blocking completion for all categories
+#   "stream" - one streamed completion, tabs render as their sections finish
+#   "split"  - one smaller completion per category, all sent in parallel
+RECOMMENDATION_MODE = os.getenv("RECOMMENDATION_MODE", "stream")
+# How mood analysis relates to the recommendation call:
+#   "serial"   - analyze_mood() finishes before recommendations start
+#   "parallel" - recommendations start on the raw user text while analyze_mood() runs alongside
+#   "fused"    - the recommendation prompt infers the mood itself and returns it on a "🧠 Mood:" line
+#                (single/stream modes; split mode runs as "parallel")
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "serial")
+# Reply format of the recommendation calls:
+#   "markdown" - numbered "Title - ... - URL" lines under emoji headers
+#   "json"     - a JSON object validated against a per-category schema, falling back to the
+#                markdown parser if the reply is not valid JSON (stream mode runs unstreamed)
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "markdown")
+# Agent tabs in the UI: "eager" generates every agent tab with the page; "lazy" waits until the
+# user asks for an agent and memoizes it for the session, optionally prefetching the
+# AGENT_PREFETCH most requested agents in the background
+AGENT_MODE = os.getenv("AGENT_MODE", "eager")
+AGENT_PREFETCH = int(os.getenv("AGENT_PREFETCH", "2"))
+# Default for the UI switch between one request per agent and one batched request for all
+# agents (eager mode only)
+AGENT_REQUEST_MODE = os.getenv("AGENT_REQUEST_MODE", "per-agent")
+# Result cache for mood analysis and parsed recommendations: max entries in memory, TTL in
+# seconds, and an optional shared store behind the memory cache so every replica (and a
+# restarted process) sees every other's results: RESULT_CACHE_URL is "redis://host:6379/0" or
+# "sqlite:////shared/volume/moodx-cache.db"; RESULT_CACHE_PATH alone is a SQLite file path
+# (empty = memory only)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "")
+RESULT_CACHE_URL = os.getenv("RESULT_CACHE_URL", "")
+# Local catalog (moodx.catalog) of recommended items indexed by mood tag and language, in a SQLite
+# file: "off", "record" (every generated result is added to it) or "retrieve" (also serves each
+# CATALOG_CATEGORIES tab it can fill for the mood, so only the rest is generated). With
+# CATALOG_RERANK, the small model orders the CATALOG_CANDIDATES best matches of each served tab.
+CATALOG_MODE = os.getenv("CATALOG_MODE", "off")
+CATALOG_PATH = os.getenv("CATALOG_PATH", "moodx_catalog.db")
+CATALOG_CATEGORIES = os.getenv("CATALOG_CATEGORIES", "cine_magic,songs,games,articles,travel,food")
+CATALOG_RERANK = os.getenv("CATALOG_RERANK", "0") == "1"
+CATALOG_CANDIDATES = int(os.getenv("CATALOG_CANDIDATES", "30"))
+# Port of the Prometheus /metrics and /stats.json endpoint started by the UI (0 = off)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
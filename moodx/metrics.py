@@ -0,0 +1,241 @@
+# Process-wide pipeline metrics: wall time per stage, per-call latency and token counts, error
+# counters, and gauges pulled from the stats() of the client, limiter and cache. Exported in
+# Prometheus text format or as a JSON snapshot, optionally over a small HTTP endpoint.
+#
+# Every observation is a lock, a dict lookup and a bisect into fixed histogram buckets, so it
+# stays on in production. A Trace collects the stage spans of a single request for display.
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HELP = {
+    "moodx_stage_seconds": ("histogram", "Wall time per pipeline stage"),
+    "moodx_stage_errors_total": ("counter", "Pipeline stages that raised"),
+    "moodx_llm_request_seconds": ("histogram", "Upstream chat completion time per call type, retries included"),
+    "moodx_llm_tokens_total": ("counter", "Prompt and completion tokens per call type"),
+    "moodx_llm_errors_total": ("counter", "Chat completion calls that failed per call type"),
+    "moodx_prompt_renders_total": ("counter", "Prompts rendered per template"),
+    "moodx_prompt_tokens_total": ("counter", "Estimated prompt tokens per template and message (system/user)"),
+    "moodx_model_request_seconds": ("histogram", "Chat completion time per model, retries included"),
+    "moodx_model_cost_usd_total": ("counter", "Estimated spend per model from MODEL_PRICES"),
+    "moodx_model_errors_total": ("counter", "Failed attempts per model, fallbacks included"),
+    "moodx_model_fallbacks_total": ("counter", "Calls served by a model after the other tier failed"),
+}
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    # Upper bound of the bucket holding the q-quantile (None past the last bucket)
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+# Stage spans of one request: (name, offset from the start of the request, seconds)
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+
+    def add(self, name, start, seconds):
+        self.spans.append((name, round(start - self.started, 4), round(seconds, 4)))
+
+    def rows(self):
+        return [{"stage": name, "start": start, "seconds": seconds} for name, start, seconds in self.spans]
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._collectors = {}
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # Stage timed by the caller, e.g. time accumulated over many interleaved calls
+    def record_stage(self, name, start, seconds, trace=None):
+        self.observe("moodx_stage_seconds", seconds, stage=name)
+        if trace is not None:
+            trace.add(name, start, seconds)
+
+    @contextmanager
+    def stage(self, name, trace=None):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("moodx_stage_errors_total", stage=name)
+            raise
+        finally:
+            self.record_stage(name, start, time.perf_counter() - start, trace)
+
+    def record_call(self, call_type, seconds, prompt_tokens=None, completion_tokens=None):
+        call_type = call_type or "untyped"
+        self.observe("moodx_llm_request_seconds", seconds, call_type=call_type)
+        if prompt_tokens:
+            self.inc("moodx_llm_tokens_total", prompt_tokens, call_type=call_type, kind="prompt")
+        if completion_tokens:
+            self.inc("moodx_llm_tokens_total", completion_tokens, call_type=call_type, kind="completion")
+
+    # fn() returns a flat dict; its numeric values are exported as moodx_<prefix>_<key> gauges.
+    # Registering the same prefix again replaces the collector.
+    def register(self, prefix, fn):
+        with self._lock:
+            self._collectors[prefix] = fn
+
+    def _gauges(self):
+        with self._lock:
+            collectors = list(self._collectors.items())
+        gauges = {}
+        for prefix, fn in collectors:
+            for key, value in fn().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"moodx_{prefix}_{key}"] = value
+        return gauges
+
+    def _copy(self):
+        histograms = {}
+        with self._lock:
+            for key, histogram in self._histograms.items():
+                copy = histograms[key] = Histogram()
+                copy.counts, copy.sum, copy.count = list(histogram.counts), histogram.sum, histogram.count
+            counters = dict(self._counters)
+        return histograms, counters
+
+    def prometheus(self):
+        histograms, counters = self._copy()
+        lines = []
+        typed = set()
+
+        def header(name, default_type):
+            if name not in typed:
+                typed.add(name)
+                metric_type, help_text = HELP.get(name, (default_type, ""))
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+
+        for (name, labels), histogram in sorted(histograms.items()):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels_text(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels_text(labels)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels_text(labels)} {histogram.count}")
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_labels_text(labels)} {value}")
+        for name, value in sorted(self._gauges().items()):
+            header(name, "gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        histograms, counters = self._copy()
+        stages = {}
+        calls = {}
+        models = {}
+        for (name, labels), histogram in histograms.items():
+            labels = dict(labels)
+            summary = {
+                "count": histogram.count,
+                "mean": round(histogram.sum / histogram.count, 4) if histogram.count else None,
+                "p50_le": histogram.quantile(0.5),
+                "p95_le": histogram.quantile(0.95),
+                "p99_le": histogram.quantile(0.99),
+            }
+            if name == "moodx_stage_seconds":
+                stages[labels["stage"]] = summary
+            elif name == "moodx_llm_request_seconds":
+                calls.setdefault(labels["call_type"], {}).update(summary)
+            elif name == "moodx_model_request_seconds":
+                models.setdefault(labels["model"], {}).update(summary)
+        errors = {}
+        prompts = {}
+        for (name, labels), value in counters.items():
+            labels = dict(labels)
+            if name == "moodx_llm_tokens_total":
+                calls.setdefault(labels["call_type"], {})[f"{labels['kind']}_tokens"] = value
+            elif name == "moodx_llm_errors_total":
+                calls.setdefault(labels["call_type"], {})["errors"] = value
+            elif name == "moodx_stage_errors_total":
+                errors[labels["stage"]] = value
+            elif name == "moodx_prompt_renders_total":
+                prompts.setdefault(labels["template"], {})["renders"] = value
+            elif name == "moodx_prompt_tokens_total":
+                prompts.setdefault(labels["template"], {})[f"{labels['part']}_tokens"] = value
+            elif name.startswith("moodx_model_") and name.endswith("_total"):
+                key = name[len("moodx_model_"):-len("_total")]
+                models.setdefault(labels["model"], {})[key] = round(value, 6)
+        return {"stages": stages, "stage_errors": errors, "calls": calls, "models": models, "prompts": prompts,
+                "gauges": self._gauges()}
+
+# Shared by every client and pipeline in the process
+metrics = Metrics()
+
+# GET /metrics (Prometheus text) and GET /stats.json on a background thread; returns the server
+def serve(port, host="0.0.0.0", registry=metrics):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = registry.prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/stats.json":
+                body, content_type = json.dumps(registry.snapshot(), ensure_ascii=False), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,200 @@
+# Parsing of recommendation completions into compact item records.
+#
+# Plain Python with no Streamlit dependency, so cached and streamed replies can be re-parsed
+# cheaply and parser throughput can be measured on its own (see benchmarks/bench_parser.py).
+import json
+import re
+from collections import namedtuple
+
+from moodx.categories import categories
+
+# Section headers the parser splits on: every registered category, disabled ones included, so a
+# stray block of one never runs into the section before it
+valid_sections = [category.header for category in categories]
+
+# Header of the mood line the model emits in fused pipeline mode
+MOOD_HEADER = "🧠 Mood"
+
+# One parsed recommendation; which of subtitle/url/extra are used depends on the category.
+# Tuple-backed, so a record costs no per-instance __dict__.
+RecommendationItem = namedtuple("RecommendationItem", ["title", "subtitle", "url", "extra"],
+                                defaults=["", None, ""])
+
+# Schema per category: its JSON key, and for each " - " separated column of the markdown line
+# format (in order) the JSON field name and the RecommendationItem field it fills
+category_schemas = {
+    category.header: (category.key, tuple((name, field) for name, field, _ in category.columns))
+    for category in categories
+}
+
+# Numbered markdown line with one "(.+?) - " group per column, the last column taking the rest.
+# Compiled once per column count and shared by every category with that layout.
+_item_patterns = {
+    count: re.compile(r'^\d+\.\s*' + r'(.+?)\s*-\s*' * (count - 1) + r'(.+)')
+    for count in {len(columns) for _, columns in category_schemas.values()}
+}
+
+# section -> (compiled item pattern, column index of subtitle, url and extra or -1 if unused);
+# the title is always the first column
+def _layout(columns):
+    fields = [field for _, field in columns]
+    return (_item_patterns[len(columns)],) + tuple(
+        fields.index(name) if name in fields else -1 for name in ("subtitle", "url", "extra")
+    )
+
+_item_layouts = {section: _layout(columns) for section, (_, columns) in category_schemas.items()}
+
+_new_item = RecommendationItem._make
+
+_not_available = frozenset(["n/a", "not available"])
+
+# Helper function to handle URL check and fallback messaging.
+def get_valid_url(url):
+    url = url.strip()
+    if url.lower() in _not_available:
+        return None
+    return url
+
+def make_item(values):
+    if not values.get("title"):
+        return None
+    if "url" in values:
+        values["url"] = get_valid_url(values["url"]) or None
+    return RecommendationItem(**values)
+
+# Matched columns -> RecommendationItem, positionally and without an intermediate dict
+def _item_from_groups(groups, subtitle_at, url_at, extra_at):
+    title = groups[0].strip()
+    if not title:
+        return None
+    return _new_item((
+        title,
+        groups[subtitle_at].strip() if subtitle_at >= 0 else "",
+        (get_valid_url(groups[url_at]) or None) if url_at >= 0 else None,
+        groups[extra_at].strip() if extra_at >= 0 else "",
+    ))
+
+# One markdown line of a section -> RecommendationItem, or None if it is not an item line
+def parse_item(section, line):
+    pattern, subtitle_at, url_at, extra_at = _item_layouts[section]
+    match = pattern.match(line)
+    if match is None:
+        return None
+    return _item_from_groups(match.groups(), subtitle_at, url_at, extra_at)
+
+# Markdown lines of one section -> RecommendationItems
+def parse_items(section, lines):
+    items = []
+    for line in lines:
+        item = parse_item(section, line)
+        if item:
+            items.append(item)
+    return items
+
+# Incremental single-pass parser: feed() takes arbitrary text chunks and returns
+# (section, items) for every section whose block has been closed by the next header;
+# close() flushes the last one. Item lines are parsed into records as they arrive.
+class SectionStreamParser:
+    def __init__(self, headers=valid_sections):
+        self.headers = tuple(headers)
+        # Header lookup table keyed on the first character, so item lines (which start with a
+        # digit) are rejected with a single dict probe instead of a scan over every header
+        self._by_initial = {}
+        for header in self.headers:
+            self._by_initial[header[0]] = self._by_initial.get(header[0], ()) + (header,)
+        # Text following the colon on a header line, e.g. the sentence after "🧠 Mood:"
+        self.inline = {}
+        self.buffer = ""
+        self.current_section = None
+        self.current_items = []
+        self._layout = None
+
+    def _finish(self):
+        if self.current_section is None:
+            return []
+        finished = [(self.current_section, self.current_items)]
+        self.current_section = None
+        self.current_items = []
+        self._layout = None
+        return finished
+
+    def _line(self, line):
+        line = line.strip()
+        if not line:
+            return []
+        candidates = self._by_initial.get(line[0])
+        if candidates and line.startswith(candidates):
+            finished = self._finish()
+            self.current_section, _, rest = (part.strip() for part in line.partition(':'))
+            if rest:
+                self.inline[self.current_section] = rest
+            self._layout = _item_layouts.get(self.current_section)
+            return finished
+        layout = self._layout
+        if layout is not None:
+            match = layout[0].match(line)
+            if match is not None:
+                item = _item_from_groups(match.groups(), layout[1], layout[2], layout[3])
+                if item:
+                    self.current_items.append(item)
+        return []
+
+    def feed(self, text):
+        self.buffer += text
+        # Most streamed deltas are a few tokens without a line break
+        if '\n' not in text:
+            return []
+        *lines, self.buffer = self.buffer.split('\n')
+        finished = []
+        for line in lines:
+            finished.extend(self._line(line))
+        return finished
+
+    def close(self):
+        finished = self._line(self.buffer)
+        self.buffer = ""
+        return finished + self._finish()
+
+# Whole markdown reply -> {section: [RecommendationItem, ...]}
+def parse_sections(text, headers=valid_sections):
+    parser = SectionStreamParser(headers)
+    sections = {}
+    for section, items in parser.feed(text) + parser.close():
+        sections[section] = items
+    return sections
+
+# RecommendationItem -> its row in a JSON reply as the json prompts ask for it: values in the
+# schema's column order, "" for a missing one and empty trailing columns left off
+def item_row(section, item):
+    row = [getattr(item, field) or "" for _, field in category_schemas[section][1]]
+    while row and not row[-1]:
+        row.pop()
+    return row
+
+# JSON reply -> ({section: [RecommendationItem, ...]}, mood or None). Items are positional rows in
+# the schema's column order, or objects keyed by column name. Items missing a title are dropped;
+# anything that is not a JSON object with at least one category raises ValueError.
+def parse_json_recommendations(text, sections):
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("JSON reply is not an object")
+    parsed = {}
+    for section in sections:
+        key, columns = category_schemas[section]
+        raw_items = data.get(key)
+        if not isinstance(raw_items, list):
+            continue
+        items = []
+        for raw in raw_items:
+            if isinstance(raw, list):
+                raw = {name: value for (name, _), value in zip(columns, raw)}
+            elif not isinstance(raw, dict):
+                continue
+            item = make_item({field: str(raw.get(name) or "").strip() for name, field in columns})
+            if item:
+                items.append(item)
+        parsed[section] = items
+    if not parsed:
+        raise ValueError("JSON reply has no recommendation categories")
+    mood = data.get("mood")
+    return parsed, mood if isinstance(mood, str) and mood.strip() else None
@@ -0,0 +1,387 @@
+# Recommendation pipeline: context, mood analysis, the recommendation prompts, the page flow
+# that ties them together and the agent fan-out. Every function takes the ChatGroq client (and
+# cache) it should use as an argument.
+import datetime
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from moodx.cache import make_cache_key
+from moodx.categories import categories, category_map, enabled_sections, item_format
+from moodx.config import (
+    AGENT_CONCURRENCY,
+    CATALOG_CANDIDATES,
+    CATALOG_RERANK,
+    CATEGORY_CONCURRENCY,
+    OUTPUT_FORMAT,
+    PIPELINE_MODE,
+    RECOMMENDATION_MODE,
+)
+from moodx.metrics import metrics
+from moodx.parser import MOOD_HEADER, SectionStreamParser, parse_json_recommendations, parse_sections, valid_sections
+from moodx.prompts import format_spec, json_spec, prompt_templates
+
+# Names of the additional agents
+agent_names = [
+    "Daily Planner",
+    "Mental Health Copilot",
+    "Social Media Curator",
+    "Budget-Friendly Recommender",
+    "Feedback Learning Agent",
+    "Geo-aware Recommender",
+    "Goal Alignment Agent",
+    "Sentiment Enhancer"
+]
+
+# Context and mood analysis
+def get_context():
+    return {
+        "time": datetime.datetime.now().strftime("%H:%M"),
+        "device": "mobile",
+        "location": "home"
+    }
+
+def analyze_mood(llm, text):
+    system, prompt = prompt_templates["mood"].render(text=text)
+    return llm.generate(prompt, 150, call_type="mood", system=system)
+
+# `found` is the result of a get_many() the caller already made for this key, so a miss is not
+# looked up (and counted) a second time
+def cached_analyze_mood(llm, cache, text, found=None):
+    key = make_cache_key("mood", text)
+    mood = cache.get(key) if found is None else found.get(key)
+    if mood is None:
+        mood = analyze_mood(llm, text)
+        cache.set(key, mood)
+    return mood
+
+# Whether the last reply the client returned on this thread was cut off at its token limit; such
+# a reply still parses, but its last section is missing items or missing altogether
+def reply_truncated(llm):
+    finish_reason = getattr(llm, "finish_reason", None)
+    return finish_reason is not None and finish_reason() == "length"
+
+# Recommendation generation with updated instructions for valid URLs.
+# With infer_mood=True, `mood` is the user's raw text and the model reports the mood first.
+# Only `sections` are requested, by default the enabled categories for these preferences.
+def generate_recommendations(llm, context, mood, preferences, stream=False, infer_mood=False, sections=None,
+                             call_type="recommendations"):
+    if sections is None:
+        sections = enabled_sections(preferences)
+    template = prompt_templates["recommendations_fused" if infer_mood else "recommendations"]
+    system, prompt = template.render(mood=mood, context=context, preferences=preferences, spec=format_spec(sections))
+    if stream:
+        return llm.generate_stream(prompt, 6000, call_type=call_type, system=system)
+    return llm.generate(prompt, 6000, call_type=call_type, system=system)
+
+# Item format and output token budget per category, used when each category is requested
+# on its own. Budgets cover the category's items in the given format with some headroom.
+category_formats = {category.header: (item_format(category), category.max_tokens) for category in categories}
+
+# The same prompt as generate_recommendations(), for a single category
+def generate_category_recommendations(llm, section, context, mood, preferences):
+    system, prompt = prompt_templates["recommendations"].render(mood=mood, context=context, preferences=preferences,
+                                                                spec=format_spec([section]))
+    # The header is prepended so the lines parse the same whether or not the model echoes it
+    text = llm.generate(prompt, category_map[section].max_tokens, call_type=f"category:{section}", system=system)
+    return parse_sections(f"{section}:\n{text}").get(section, [])
+
+# Category budgets are sized for markdown lines; a JSON reply adds quotes, commas and brackets
+# around every value, and a reply cut off at the budget does not parse at all
+json_token_headroom = 1.25
+
+def generate_category_recommendations_json(llm, section, context, mood, preferences):
+    max_tokens = int(category_formats[section][1] * json_token_headroom)
+    reply = generate_recommendations_json(llm, context, mood, preferences, [section], max_tokens,
+                                          call_type=f"category:{section}")
+    try:
+        return parse_json_recommendations(reply, [section])[0].get(section, [])
+    except ValueError:
+        return parse_sections(f"{section}:\n{reply}").get(section, [])
+
+# Split mode: one prompt per category, sent in parallel and yielded as each finishes,
+# so the slowest category no longer holds up the others. Yields (section, items, error); a
+# category whose reply was cut off keeps the items it got and reports that as its error.
+def generate_recommendations_split(llm, context, mood, preferences, sections, max_workers=CATEGORY_CONCURRENCY,
+                                   output_format="markdown"):
+    generate_category = (generate_category_recommendations_json if output_format == "json"
+                         else generate_category_recommendations)
+
+    def generate(section):
+        items = generate_category(llm, section, context, mood, preferences)
+        return items, "reply was cut off at the token limit" if reply_truncated(llm) else None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sections)))) as executor:
+        futures = {executor.submit(generate, section): section for section in sections}
+        for future in as_completed(futures):
+            try:
+                yield (futures[future], *future.result())
+            except Exception as e:
+                yield futures[future], [], str(e)
+
+# JSON output mode: the same request as generate_recommendations(), answered as one JSON object
+# keyed per category instead of numbered markdown lines
+def generate_recommendations_json(llm, context, mood, preferences, sections, max_tokens=6000, infer_mood=False,
+                                  call_type="recommendations_json"):
+    template = prompt_templates["recommendations_json_fused" if infer_mood else "recommendations_json"]
+    system, prompt = template.render(mood=mood, context=context, preferences=preferences, spec=json_spec(sections))
+    return llm.generate(prompt, max_tokens, json_mode=True, call_type=call_type, system=system)
+
+# Catalog fast path: the requested sections a moodx.catalog.Catalog can fill for this mood and
+# language, with no completion at all, or with one small-model call that orders each section's
+# best candidates when rerank is on. Returns {section: items}; the other sections are still
+# for the model, e.g. generate_recommendations(..., sections=gaps, call_type=gaps_call_type).
+# Gap-only requests are much shorter than full ones, so they get their own token budget and
+# latency history (the router still sends them to the recommendations tier)
+gaps_call_type = "recommendations:catalog_gaps"
+
+def retrieve_recommendations(llm, catalog, context, mood, preferences, sections, rerank=CATALOG_RERANK):
+    language = preferences.get("language", "English")
+    if not rerank:
+        return catalog.lookup(mood, language, sections)
+    found = catalog.lookup(mood, language, sections, candidates=CATALOG_CANDIDATES)
+    return rerank_recommendations(llm, found, mood, context) if found else found
+
+# Keeps each section's item count, in the order the model picks; unpicked slots are filled in
+# catalog order, which is also the answer if the call fails
+def rerank_recommendations(llm, sections, mood, context):
+    blocks = []
+    for section, items in sections.items():
+        category = category_map[section]
+        blocks.append(f'"{category.key}" (pick {category.items}):')
+        blocks += [f"{i}. " + " - ".join(field for field in (item.title, item.subtitle) if field)
+                   for i, item in enumerate(items)]
+    system, prompt = prompt_templates["catalog_rerank"].render(mood=mood, context=context, candidates="\n".join(blocks))
+    try:
+        reply = json.loads(llm.generate(prompt, 60 * len(sections), json_mode=True, call_type="catalog_rerank",
+                                        system=system))
+    except Exception:
+        reply = {}
+    ranked = {}
+    for section, items in sections.items():
+        picks = reply.get(category_map[section].key) if isinstance(reply, dict) else None
+        order = []
+        for pick in picks if isinstance(picks, list) else []:
+            if type(pick) is int and 0 <= pick < len(items) and pick not in order:
+                order.append(pick)
+        order += [i for i in range(len(items)) if i not in order]
+        ranked[section] = [items[i] for i in order[:category_map[section].items]]
+    return ranked
+
+# One page of recommendations, the flow behind a click of Generate Recommendations in app2.py,
+# a moodx.batch record and a benchmarks/load_test.py page: one get_many() for the cached mood and
+# sections, mood analysis as `pipeline_mode` says, the catalog fast path, the recommendation
+# call(s) in `mode` and `output_format`, parsing, and the write-back to the cache and catalog.
+# A generator, so a front-end can draw each part as it arrives:
+#   ("mood", text)                  when the mood is known (before or after the sections)
+#   ("section", (section, items))   for each section, whether cached, served or generated
+#   ("error", (section, message))   for a category request that failed or was cut off (split mode)
+#   ("done", page)                  last; page has "mood", "context", "sections" and "cached"
+# Stage timings go to moodx.metrics (and `trace`). Without a cache nothing is looked up or stored.
+def generate_page(llm, cache, text, preferences, context=None, catalog=None, mode=RECOMMENDATION_MODE,
+                  pipeline_mode=PIPELINE_MODE, output_format=OUTPUT_FORMAT, trace=None):
+    context = context or get_context()
+    mood = None
+    mood_future = None
+    # One round trip to the shared cache for both results; mood analysis reuses this lookup
+    # instead of asking the cache again
+    mood_key = make_cache_key("mood", text)
+    recommendations_key = make_cache_key("recommendations", text, preferences, context)
+    found = cache.get_many([mood_key, recommendations_key]) if cache is not None else {}
+    cached_sections = found.get(recommendations_key)
+
+    def mood_analysis():
+        return cached_analyze_mood(llm, cache, text, found) if cache is not None else analyze_mood(llm, text)
+
+    def remember_mood(value):
+        if cache is not None:
+            cache.set(mood_key, value)
+
+    fused = pipeline_mode == "fused" and mode != "split"
+    if pipeline_mode == "serial":
+        with metrics.stage("mood", trace):
+            mood = mood_analysis()
+        yield "mood", mood
+    elif not fused:
+        # Speculative: mood analysis runs alongside the recommendation call
+        mood_executor = ThreadPoolExecutor(max_workers=1)
+        mood_future = mood_executor.submit(mood_analysis)
+        mood_executor.shutdown(wait=False)
+    # Without a mood yet, recommendations are driven by the user's own words
+    mood_input = mood if mood is not None else text
+
+    # Only enabled categories are requested, and Products only if the user wants them
+    requested_sections = enabled_sections(preferences)
+    section_errors = False
+    truncated = False
+    # Parsing interleaves with the network reads, so its time is summed up separately
+    recommendations_started = time.perf_counter()
+    parse_seconds = 0.0
+
+    # Catalog fast path: sections the local catalog can fill for this mood are served from it
+    # right away, and only the remaining sections are generated
+    served_sections = {}
+    if cached_sections is None and catalog is not None and catalog.retrieve:
+        with metrics.stage("catalog", trace):
+            served_sections = retrieve_recommendations(llm, catalog, context, mood_input, preferences,
+                                                       requested_sections)
+        for section, items in served_sections.items():
+            yield "section", (section, items)
+    generate_sections = [section for section in requested_sections if section not in served_sections]
+    recommendations_call = gaps_call_type if served_sections else "recommendations"
+
+    sections = {}
+    if cached_sections is not None:
+        # Same mood text, preferences and part of day as a recent request on any replica
+        sections = dict(cached_sections)
+        for section, items in sections.items():
+            yield "section", (section, items)
+    elif not generate_sections:
+        pass
+    elif mode == "split":
+        # Split mode: every category is its own request; merge into the same sections dict
+        for section, items, error in generate_recommendations_split(llm, context, mood_input, preferences,
+                                                                     generate_sections, output_format=output_format):
+            sections[section] = items
+            yield "section", (section, items)
+            if error:
+                section_errors = True
+                yield "error", (section, error)
+    else:
+        chunks = []
+        if output_format == "json":
+            # JSON mode: one structured reply validated into records
+            reply = generate_recommendations_json(llm, context, mood_input, preferences, generate_sections,
+                                                  infer_mood=fused,
+                                                  call_type="recommendations_json:catalog_gaps" if served_sections
+                                                  else "recommendations_json")
+            truncated = reply_truncated(llm)
+            parse_started = time.perf_counter()
+            try:
+                parsed, json_mood = parse_json_recommendations(reply, generate_sections)
+            except ValueError:
+                # Not the JSON we asked for: run the legacy markdown parser over it instead
+                chunks = [reply]
+                parsed, json_mood = {}, None
+            parse_seconds += time.perf_counter() - parse_started
+            if json_mood:
+                mood = json_mood
+                remember_mood(mood)
+                yield "mood", mood
+            for section, items in parsed.items():
+                sections[section] = items
+                yield "section", (section, items)
+        elif mode == "stream":
+            # Streaming mode: each section is ready the moment its block in the completion is closed
+            chunks = generate_recommendations(llm, context, mood_input, preferences, stream=True, infer_mood=fused,
+                                              sections=generate_sections, call_type=recommendations_call)
+        else:
+            chunks = [generate_recommendations(llm, context, mood_input, preferences, infer_mood=fused,
+                                               sections=generate_sections, call_type=recommendations_call)]
+            truncated = reply_truncated(llm)
+
+        parser = SectionStreamParser(valid_sections + [MOOD_HEADER] if fused else valid_sections)
+
+        def parsed_sections():
+            nonlocal parse_seconds
+            for chunk in chunks:
+                parse_started = time.perf_counter()
+                finished = parser.feed(chunk)
+                parse_seconds += time.perf_counter() - parse_started
+                yield from finished
+            parse_started = time.perf_counter()
+            finished = parser.close()
+            parse_seconds += time.perf_counter() - parse_started
+            yield from finished
+
+        for section, items in parsed_sections():
+            if section == MOOD_HEADER:
+                if parser.inline.get(MOOD_HEADER):
+                    mood = parser.inline[MOOD_HEADER]
+                    remember_mood(mood)
+                    yield "mood", mood
+                continue
+            if section in served_sections:
+                # Not asked for: the catalog already filled this section
+                continue
+            sections[section] = items
+            yield "section", (section, items)
+        if mode == "stream":
+            # Known once the stream has been read to the end
+            truncated = reply_truncated(llm)
+    sections.update(served_sections)
+    metrics.record_stage("recommendations", recommendations_started, time.perf_counter() - recommendations_started,
+                         trace)
+    metrics.record_stage("parse", recommendations_started, parse_seconds, trace)
+
+    # The agents still need a mood: take the speculative result, or fall back to a regular
+    # analysis when the fused reply or the cache did not provide one
+    if mood is None:
+        with metrics.stage("mood_wait" if mood_future is not None else "mood", trace):
+            mood = mood_future.result() if mood_future is not None else mood_analysis()
+        yield "mood", mood
+
+    # Partial pages are not worth serving again: a failed category request, a reply cut off at its
+    # token limit, or a requested section that came back empty
+    complete = not section_errors and not truncated and all(sections.get(section) for section in requested_sections)
+    if cached_sections is None and complete and cache is not None:
+        cache.set(recommendations_key, sections)
+    # Newly generated sections feed the catalog, indexed by the user's words and the analyzed mood
+    if cached_sections is None and catalog is not None:
+        catalog.add({section: sections[section] for section in generate_sections if section in sections},
+                    preferences.get("language", "English"), text, mood)
+    yield "done", {"mood": mood, "context": context, "sections": sections, "cached": cached_sections is not None}
+
+# generate_page() run to the end, for callers that do not render as the page fills -> its page
+def run_page(*args, **kwargs):
+    for kind, value in generate_page(*args, **kwargs):
+        if kind == "done":
+            return value
+
+# New function to generate recommendations for additional agents based on mood and context.
+def generate_agent_recommendation(llm, agent_name, mood, context):
+    system, prompt = prompt_templates["agent"].render(agent=agent_name, mood=mood, context=context)
+    try:
+        return llm.generate(prompt, 500, call_type="agent", system=system)
+    except Exception as e:
+        return f"Error generating recommendation: {str(e)}"
+
+# Fan the agent prompts out over a thread pool and yield each result as soon as it arrives.
+# generate_agent_recommendation() already turns failures into text, so one slow or failing
+# agent never holds back the others.
+def generate_agent_recommendations(llm, agent_names, mood, context, max_workers=AGENT_CONCURRENCY):
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(agent_names)))) as executor:
+        futures = {
+            executor.submit(generate_agent_recommendation, llm, agent, mood, context): agent
+            for agent in agent_names
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+# Batched variant: one JSON completion answers for every agent, so the mood/context preamble is
+# sent once and the page costs one request against the rate limit instead of one per agent.
+# Agents missing from the reply, or all of them if the call fails or its reply is not JSON, fall
+# back to their own request; yields like the function above.
+def generate_agent_recommendations_batched(llm, agent_names, mood, context):
+    agent_list = "\n".join(f"- {agent}" for agent in agent_names)
+    system, prompt = prompt_templates["agents_batch"].render(mood=mood, context=context, agents=agent_list)
+    try:
+        reply = json.loads(llm.generate(prompt, 250 * len(agent_names), json_mode=True, call_type="agents_batch",
+                                        system=system))
+    except Exception:
+        # No usable batched reply: every agent gets its own request instead
+        yield from generate_agent_recommendations(llm, agent_names, mood, context)
+        return
+    answers = {}
+    if isinstance(reply, dict):
+        by_name = {str(name).strip().lower(): text for name, text in reply.items()}
+        for agent in agent_names:
+            text = by_name.get(agent.lower())
+            if isinstance(text, str) and text.strip():
+                answers[agent] = text.strip()
+    for agent in agent_names:
+        if agent in answers:
+            yield agent, answers[agent]
+    missing = [agent for agent in agent_names if agent not in answers]
+    if missing:
+        yield from generate_agent_recommendations(llm, missing, mood, context)
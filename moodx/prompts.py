@@ -0,0 +1,121 @@
+# Prompt templates. Each call's fixed instructions live in a system message that never changes
+# between requests; only the per-request values (mood, context, preferences, the requested
+# categories) go in the user message. Formats are described once per category instead of
+# spelled out item by item.
+#
+# Every render is counted per template in moodx.metrics (estimated system and user tokens), and
+# benchmarks/bench_prompts.py reports and checks the sizes, so prompt growth shows up as a number.
+from moodx.categories import category_map, item_format
+from moodx.metrics import metrics
+from moodx.parser import MOOD_HEADER, category_schemas
+
+# Rough token count: ~4 characters per token, the same estimate the rate limiter reserves with
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+class PromptTemplate:
+    def __init__(self, name, system, user):
+        self.name = name
+        self.system = system
+        self.user = user
+
+    # -> (system message, user message)
+    def render(self, **values):
+        user = self.user.format(**values)
+        metrics.inc("moodx_prompt_renders_total", template=self.name)
+        metrics.inc("moodx_prompt_tokens_total", estimate_tokens(self.system), template=self.name, part="system")
+        metrics.inc("moodx_prompt_tokens_total", estimate_tokens(user), template=self.name, part="user")
+        return self.system, user
+
+    # Estimated tokens of the rendered messages, without counting a render
+    def tokens(self, **values):
+        system = estimate_tokens(self.system)
+        user = estimate_tokens(self.user.format(**values))
+        return {"system": system, "user": user, "total": system + user}
+
+# "🎵 Songs: [Song Title] - [Artist] - [URL]" per section, under a line with the item count
+def format_spec(sections):
+    counts = {category_map[section].items for section in sections}
+    if len(counts) == 1:
+        lines = [f"Categories ({counts.pop()} recommendations each):"]
+        lines += [f"{section}: {item_format(category_map[section])}" for section in sections]
+    else:
+        lines = ["Categories (number of recommendations in brackets):"]
+        lines += [f"{section} ({category_map[section].items}): {item_format(category_map[section])}"
+                  for section in sections]
+    return "\n".join(lines)
+
+# '"songs": ["title", "artist", "url"]' per section, under a line with the item count. Rows are
+# positional, so field names are sent once here instead of repeated on every item of the reply.
+def json_spec(sections):
+    counts = {category_map[section].items for section in sections}
+    uniform = len(counts) == 1
+    lines = [f"Keys ({counts.pop()} rows each):" if uniform else "Keys (number of rows in brackets):"]
+    for section in sections:
+        key, columns = category_schemas[section]
+        count = "" if uniform else f" ({category_map[section].items})"
+        lines.append(f'"{key}": [' + ", ".join(f'"{name}"' for name, _ in columns) + "]" + count)
+    return "\n".join(lines)
+
+_recommendation_rules = """You are MoodX Machina, a recommendation engine. Recommend content and activities that fit the user's mood, context and preferences.
+Answer in this format only, with no other text:
+each requested category's header exactly as listed followed by a colon, on its own line; below it, its recommendations numbered from 1, one per line, with the listed fields in order separated by " - ".
+If a valid URL is not available for a recommendation, write "N/A" for the URL field."""
+
+_json_rules = """You are MoodX Machina, a recommendation engine. Recommend content and activities that fit the user's mood, context and preferences.
+Reply with a single JSON object, without whitespace. For each requested key, give an array of rows, each an array of the listed fields' string values in order.
+Use "" for a missing value, such as an unknown URL, and drop empty values at the end of a row."""
+
+_request = """Mood: {mood}
+Context: {context}
+Preferences: {preferences}
+{spec}"""
+
+# With the mood inferred by the model, the user message carries the user's own words
+_fused_request = """What the user said: {mood}
+Context: {context}
+Preferences: {preferences}
+{spec}"""
+
+prompt_templates = {
+    "mood": PromptTemplate(
+        "mood",
+        "Analyze the mood of the user's text. Reply with one short sentence.",
+        "{text}",
+    ),
+    "recommendations": PromptTemplate("recommendations", _recommendation_rules, _request),
+    "recommendations_fused": PromptTemplate(
+        "recommendations_fused",
+        _recommendation_rules + f'\nStart with one line of the form "{MOOD_HEADER}: <the user\'s mood in one short sentence>".',
+        _fused_request,
+    ),
+    "recommendations_json": PromptTemplate("recommendations_json", _json_rules, _request),
+    "recommendations_json_fused": PromptTemplate(
+        "recommendations_json_fused",
+        _json_rules + '\nAdd a "mood" field with the user\'s mood in one short sentence.',
+        _fused_request,
+    ),
+    # Orders catalog matches instead of generating items: a short JSON reply from the small model
+    "catalog_rerank": PromptTemplate(
+        "catalog_rerank",
+        "You are MoodX Machina's recommendation ranker. For each listed key, pick the numbered candidates that "
+        "best fit the user's mood and context, best first. Reply with a single JSON object mapping each key to "
+        "an array of the picked candidate numbers.",
+        "Mood: {mood}\nContext: {context}\n{candidates}",
+    ),
+    "agent": PromptTemplate(
+        "agent",
+        "You are one of MoodX Machina's assistant agents. Given the user's mood and context, give a concise "
+        "recommendation for enhancing the user's day in the role of the named agent. Include one actionable "
+        "suggestion if possible.",
+        "Agent: {agent}\nMood: {mood}\nContext: {context}",
+    ),
+    "agents_batch": PromptTemplate(
+        "agents_batch",
+        "You are MoodX Machina's assistant agents. Given the user's mood and context, give a concise "
+        "recommendation for enhancing the user's day from each listed agent, with one actionable suggestion "
+        "per agent if possible. Reply with a single JSON object mapping each agent name exactly as written "
+        "to its recommendation text.",
+        "Mood: {mood}\nContext: {context}\nAgents:\n{agents}",
+    ),
+}
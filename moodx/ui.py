@@ -0,0 +1,237 @@
+# Streamlit building blocks shared by the front-ends: page theme, shared client and cache,
+# and the tab renderers for parsed recommendations. Only this module imports Streamlit.
+from html import escape
+from string import Formatter
+
+import streamlit as st
+
+from moodx.cache import ResultCache
+from moodx.catalog import open_catalog
+from moodx.categories import categories, category_map, enabled_sections
+from moodx.client import ChatGroq, HTTPTransport
+from moodx.metrics import metrics
+from moodx.parser import MOOD_HEADER
+from moodx.pipeline import agent_names
+
+# The transport and client live in Streamlit's resource cache so the connection pool
+# survives script reruns and is shared by every session in this process.
+# Their counters are exported as gauges alongside the pipeline metrics.
+@st.cache_resource
+def get_llm(api_key, model_name):
+    llm = ChatGroq(api_key, model_name, HTTPTransport())
+    metrics.register("transport", llm.transport.stats)
+    metrics.register("limiter", llm.limiter.stats)
+    metrics.register("singleflight", llm.singleflight.stats)
+    metrics.register("hedge", llm.hedge.stats)
+    return llm
+
+@st.cache_resource
+def get_result_cache():
+    cache = ResultCache()
+    metrics.register("cache", cache.stats)
+    return cache
+
+# The local catalog when CATALOG_MODE turns it on, None otherwise
+@st.cache_resource
+def get_catalog():
+    catalog = open_catalog()
+    if catalog is not None:
+        metrics.register("catalog", catalog.stats)
+    return catalog
+
+# Streamlit UI configuration with a futuristic, dark theme
+page_css = """
+<style>
+/* Global futuristic style */
+body {
+    background-color: #000000 !important;
+}
+[data-testid="stAppViewContainer"] {
+    background-color: #000000;
+}
+/* Custom glowing fonts and UI */
+@import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@500&display=swap');
+html, body, * {
+    font-family: 'Orbitron', sans-serif;
+    color: #f0f0f0;
+}
+/* Animated glowing title */
+.glow-title {
+    font-size: 2.5em;
+    text-align: left;
+    animation: glow 2s ease-in-out infinite alternate;
+    color: #f72585;
+    text-shadow: 0 0 5px #f72585, 0 0 10px #7209b7, 0 0 20px #3a0ca3;
+}
+@keyframes glow {
+    from {
+        text-shadow: 0 0 5px #f72585, 0 0 10px #7209b7, 0 0 20px #3a0ca3;
+    }
+    to {
+        text-shadow: 0 0 10px #f72585, 0 0 20px #7209b7, 0 0 30px #3a0ca3;
+    }
+}
+/* Glowing module section */
+.section {
+    padding: 25px;
+    border-radius: 15px;
+    margin: 20px 0;
+    background: #111111;
+    border: 1px solid #7209b7;
+    box-shadow: 0 0 15px #f72585, 0 0 20px #7209b7 inset;
+}
+/* Glowing headers */
+.header {
+    color: #f72585;
+    font-size: 1.6em;
+    margin-bottom: 15px;
+    text-shadow: 0 0 5px #f72585, 0 0 10px #7209b7;
+}
+/* Neon glowing item blocks */
+.item {
+    margin: 15px 0;
+    padding: 15px;
+    border-left: 4px solid #7209b7;
+    background: rgba(255, 255, 255, 0.05);
+    box-shadow: 0 0 8px #3a0ca3;
+    transition: transform 0.2s;
+}
+.item:hover {
+    transform: scale(1.03);
+    box-shadow: 0 0 12px #f72585;
+}
+/* Tabs styling */
+[data-testid="stTabs"] button {
+    background-color: #111111;
+    color: #f0f0f0;
+    border: none;
+    border-radius: 0;
+    border-bottom: 3px solid #7209b7;
+    transition: all 0.3s ease;
+}
+[data-testid="stTabs"] button:hover {
+    color: #f72585;
+    border-bottom: 3px solid #f72585;
+    box-shadow: 0 0 5px #f72585;
+}
+[data-testid="stTabs"] button[data-selected="true"] {
+    background-color: #1a1a1a;
+    border-bottom: 3px solid #f72585;
+    box-shadow: 0 0 10px #f72585;
+}
+/* Input text area glow */
+textarea {
+    background-color: #0d0d0d !important;
+    color: #f0f0f0 !important;
+    border: 1px solid #f72585 !important;
+    box-shadow: 0 0 5px #f72585 inset !important;
+}
+/* Button styling */
+button[kind="primary"] {
+    background-color: #f72585;
+    color: white;
+    box-shadow: 0 0 10px #f72585;
+}
+button[kind="primary"]:hover {
+    background-color: #7209b7;
+    box-shadow: 0 0 15px #7209b7;
+}
+/* Image styling */
+.stImage > img {
+    border: 2px solid #f72585;
+    border-radius: 10px;
+    box-shadow: 0 0 10px #f72585;
+}
+</style>
+"""
+
+def setup_page():
+    st.set_page_config(page_title="MoodX Machina", layout="wide")
+    st.markdown(page_css, unsafe_allow_html=True)
+
+# Tab titles, and the tabs shown by default in registry order ("Cine Magic" comes first)
+tab_names = {category.header: category.tab_name for category in categories}
+ordered_sections = enabled_sections()
+
+# Item HTML per category as a str.format template; {link} is a link labelled with the category's
+# label. Each tab is rendered as one HTML string and sent in one st.markdown call instead of a
+# call per item.
+_link_template = '<div class="item"><b>{title}</b><br>{link}</div>'
+section_templates = {
+    "🍿 Cine Magic": '<div class="item"><b>{title}</b><br><em>{subtitle}</em><br>{link}</div>',
+    "🎵 Songs": '<div class="item"><b>{title}</b> by {subtitle}<br>{link}</div>',
+    "🛍️ Products": '<div class="item"><b>{title}</b><br>{extra}<br>{link}</div>',
+    "🎮 Games": '<div class="item"><b>{title}</b><br><em>Platform: {subtitle}</em></div>',
+    "🎬 Movies": '<div class="item"><b>{title}</b><br><em>{subtitle}</em><br>{extra}<br>{link}</div>',
+}
+# Templates compiled once into %-format strings plus the record fields they use, in order
+def _compile_template(template):
+    parts = []
+    fields = []
+    for literal, field, _, _ in Formatter().parse(template):
+        parts.append(literal.replace("%", "%%"))
+        if field:
+            parts.append("%s")
+            fields.append(field)
+    return "".join(parts), tuple(fields)
+
+_compiled_templates = {
+    category.header: _compile_template(section_templates.get(category.header, _link_template))
+    for category in categories
+}
+
+# Parsed items of one section -> the tab's complete HTML. Only the fields the template shows
+# are escaped, each exactly once.
+def section_html(section, items):
+    template, fields = _compiled_templates[section]
+    label = category_map[section].label
+    parts = [f"<div class='section'><div class='header'>{tab_names[section]}</div>"]
+    for item in items:
+        values = []
+        for field in fields:
+            if field == "link":
+                url = item.url
+                values.append(f'<a href="{escape(url)}" target="_blank">{label}</a>' if url else "Link Coming Soon")
+            else:
+                values.append(escape(getattr(item, field)))
+        parts.append(template % tuple(values))
+    parts.append("</div>")
+    return "".join(parts)
+
+# Tabs are laid out up front with a placeholder each, so a tab can be filled as soon as its
+# content is ready, whether it was just generated or restored from the session.
+def layout_section_tabs(sections=ordered_sections):
+    tabs = st.tabs([tab_names[sec] for sec in sections])
+    placeholders = {}
+    for i, sec in enumerate(sections):
+        with tabs[i]:
+            placeholders[sec] = st.empty()
+            placeholders[sec].markdown("<div class='section'>Generating...</div>", unsafe_allow_html=True)
+    return placeholders
+
+def fill_section_tab(placeholders, section, items):
+    if section in placeholders:
+        placeholders[section].markdown(section_html(section, items), unsafe_allow_html=True)
+
+# =======================================================
+# Additional Agent Recommendations Section
+# These extra agents now use dynamic prompting to generate
+# mood-relevant, actionable suggestions.
+# =======================================================
+def layout_agent_tabs():
+    st.markdown("<hr>", unsafe_allow_html=True)
+    st.markdown("<div class='glow-title'>🤖 Additional Agent Suggestions</div>", unsafe_allow_html=True)
+    agent_tabs = st.tabs(agent_names)
+    placeholders = {}
+    for i, agent in enumerate(agent_names):
+        with agent_tabs[i]:
+            st.markdown(f"<div class='section'><div class='header'>{agent}</div></div>", unsafe_allow_html=True)
+            placeholders[agent] = st.empty()
+            placeholders[agent].markdown("<div style='font-size:1.1em;'>Thinking...</div>", unsafe_allow_html=True)
+    return placeholders
+
+def fill_agent_tab(placeholders, agent, recommendation_text):
+    placeholders[agent].markdown(f"<div style='font-size:1.1em;'>{recommendation_text}</div>", unsafe_allow_html=True)
+
+def show_mood(placeholder, detected_mood):
+    placeholder.markdown(f"<div class='header'>{MOOD_HEADER}: {detected_mood}</div>", unsafe_allow_html=True)
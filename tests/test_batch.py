@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.batch import CheckpointMismatch, process_record, run_batch  # noqa: E402
+from moodx.cache import ResultCache  # noqa: E402
+from moodx.categories import categories  # noqa: E402
+
+class FakeLLM:
+    def __init__(self, sections=("🎵 Songs",), finish_reason="stop"):
+        self.sections = sections
+        self.reason = finish_reason
+        self.calls = 0
+
+    def generate(self, prompt, *args, **kwargs):
+        if kwargs.get("call_type") == "mood":
+            return "Happy."
+        self.calls += 1
+        return "\n".join(f"{section}:\n1. Title - Note - https://example.com" for section in self.sections)
+
+    def finish_reason(self):
+        return self.reason
+
+def write_input(path, texts):
+    path.write_text("".join(json.dumps({"user_text": text}) + "\n" for text in texts), encoding="utf-8")
+    return str(path)
+
+def test_existing_output_without_checkpoint_is_kept(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"line": "earlier"}\n', encoding="utf-8")
+    summary = run_batch(FakeLLM(), ResultCache(url=""), write_input(tmp_path / "a.jsonl", ["a", "b"]), str(output))
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert summary["ok"] == 2
+    assert lines[0] == '{"line": "earlier"}' and len(lines) == 3
+
+def test_checkpoint_of_another_input_is_refused(tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    first = write_input(tmp_path / "a.jsonl", ["a", "b", "c"])
+    assert run_batch(FakeLLM(), ResultCache(url=""), first, output)["ok"] == 3
+    # Same input: everything is already done
+    assert run_batch(FakeLLM(), ResultCache(url=""), first, output)["records"] == 0
+    with pytest.raises(CheckpointMismatch):
+        run_batch(FakeLLM(), ResultCache(url=""), write_input(tmp_path / "b.jsonl", ["d", "e"]), output)
+
+# A page is only served from the cache again if every section came back and the reply was not cut off
+@pytest.mark.parametrize("sections, finish_reason, calls", [
+    ([category.header for category in categories], "stop", 1),
+    ([category.header for category in categories], "length", 2),
+    (["🎵 Songs"], "stop", 2),
+])
+def test_only_complete_pages_are_cached(sections, finish_reason, calls):
+    llm = FakeLLM(sections, finish_reason)
+    cache = ResultCache(url="")
+    for line_number in range(2):
+        assert "error" not in process_record(llm, cache, line_number, json.dumps({"user_text": "a"}))
+    assert llm.calls == calls
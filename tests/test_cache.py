@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+from mock_redis import Store, start_server  # noqa: E402
+from moodx.cache import RedisBackend, RedisError  # noqa: E402
+
+class OOMStore(Store):
+    # SETs of keys ending in "oom" are refused like a Redis over maxmemory
+    def execute(self, command):
+        if command[0].upper() == b"SET" and command[1].endswith(b"oom"):
+            return Exception("OOM command not allowed when used memory > 'maxmemory'")
+        return super().execute(command)
+
+@pytest.fixture
+def redis_url(monkeypatch):
+    import mock_redis
+    monkeypatch.setattr(mock_redis, "Store", OOMStore)
+    server, _ = start_server(type("Args", (), {"latency_ms": 0.0})())
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+
+def test_error_reply_mid_pipeline_keeps_replies_in_sync(redis_url):
+    backend = RedisBackend(redis_url, prefix="")
+    with pytest.raises(RedisError, match="OOM"):
+        backend.set_many([("a", b"1"), ("oom", b"2"), ("b", b"3")], 60)
+    assert backend.get_many(["a", "b", "x"]) == {"a": b"1", "b": b"3"}
+    backend.set_many([("x", b"4")], 60)
+    assert backend.get_many(["x", "y"]) == {"x": b"4"}
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.catalog import mood_tags  # noqa: E402
+
+@pytest.mark.parametrize("text, tags", [
+    ("I am not happy at all", []),
+    ("I have no energy today", []),
+    ("I don't feel relaxed, I'm stressed", ["stressed"]),
+    ("I never get bored but I'm tired", ["tired"]),
+    ("Downloading something new, good old times", []),
+    ("Content with my product, missing nothing", []),
+    ("I'm excited and looking for new adventures!", ["excited", "adventurous"]),
+    ("You sound thrilled and ready to explore.", ["excited", "adventurous"]),
+])
+def test_mood_tags(text, tags):
+    assert mood_tags(text) == tags
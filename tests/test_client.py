@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.client import ChatGroq, HedgePolicy, RateLimiter  # noqa: E402
+from moodx.metrics import Metrics  # noqa: E402
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.text = ""
+
+    def json(self):
+        return self.body
+
+    def close(self):
+        pass
+
+# Answers with the given statuses in turn, then a 10-token completion
+class FakeTransport:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def post(self, url, headers, json, timeout=None, stream=False):
+        if self.statuses:
+            return FakeResponse(self.statuses.pop(0), headers={"retry-after": "0.001"})
+        return FakeResponse(200, {"choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+                                  "usage": {"prompt_tokens": 5, "completion_tokens": 5, "total_tokens": 10}})
+
+def test_retries_give_back_their_token_reservation():
+    limiter = RateLimiter(rpm=0, tpm=100000)
+    llm = ChatGroq("key", "model", FakeTransport([429, 429, 503]), limiter=limiter, metrics=Metrics())
+    assert llm.generate("hello", 6000) == "ok"
+    level = limiter._buckets["tokens"][1]
+    assert level > 100000 - 100
+
+class FakeStream(FakeResponse):
+    def __init__(self, chunks):
+        super().__init__(200)
+        self.chunks = chunks
+
+    def iter_lines(self, decode_unicode=False):
+        for chunk in self.chunks:
+            yield 'data: {"choices": [{"delta": {"content": "%s"}}]}' % chunk
+        yield "data: [DONE]"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+def test_closed_stream_gives_back_its_reservation():
+    limiter = RateLimiter(rpm=0, tpm=100000)
+    llm = ChatGroq("key", "model", FakeTransport([]), limiter=limiter, metrics=Metrics())
+    llm.transport.post = lambda *args, **kwargs: FakeStream(["abcd"] * 100)
+    first, stream = llm._start_stream(llm._payload("hello", 6000), None, "recommendations")
+    assert first == "abcd"
+    # A hedge's losing stream is closed after its first token
+    llm._discard_stream((first, stream))
+    assert limiter._buckets["tokens"][1] > 100000 - 100
+
+def test_hedged_calls_are_streamed_so_the_loser_can_be_closed():
+    llm = ChatGroq("key", "model", FakeTransport([]), limiter=RateLimiter(rpm=0, tpm=0), metrics=Metrics(),
+                   hedge=HedgePolicy("recommendations"))
+    payloads = []
+
+    def post(url, headers, json, timeout=None, stream=False):
+        payloads.append(json)
+        return FakeStream(["ab", "cd"])
+
+    llm.transport.post = post
+    assert llm.generate("hello", 6000, call_type="recommendations") == "abcd"
+    assert payloads[0]["stream"] is True
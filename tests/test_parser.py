@@ -0,0 +1,26 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.parser import RecommendationItem, item_row, parse_json_recommendations  # noqa: E402
+
+def test_json_rows_follow_the_column_order():
+    reply = json.dumps({"songs": [["Levitating", "Dua Lipa", "N/A"], ["Intro", "The xx"], ["", "Nobody", "N/A"]]})
+    sections, mood = parse_json_recommendations(reply, ["🎵 Songs"])
+    assert sections["🎵 Songs"] == [RecommendationItem("Levitating", "Dua Lipa", None, ""),
+                                   RecommendationItem("Intro", "The xx", None, "")]
+    assert mood is None
+
+def test_json_objects_are_still_accepted():
+    reply = json.dumps({"songs": [{"title": "Levitating", "artist": "Dua Lipa", "url": "https://example.com"}]})
+    sections, _ = parse_json_recommendations(reply, ["🎵 Songs"])
+    assert sections["🎵 Songs"] == [RecommendationItem("Levitating", "Dua Lipa", "https://example.com", "")]
+
+def test_rows_leave_out_empty_trailing_values():
+    items = [RecommendationItem("Levitating", "Dua Lipa", None, ""), RecommendationItem("Intro", "", "https://x.y", "")]
+    rows = [item_row("🎵 Songs", item) for item in items]
+    assert rows == [["Levitating", "Dua Lipa"], ["Intro", "", "https://x.y"]]
+    sections, _ = parse_json_recommendations(json.dumps({"songs": rows}), ["🎵 Songs"])
+    assert sections["🎵 Songs"] == items
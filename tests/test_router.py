@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from moodx.client import ModelRouter  # noqa: E402
+from moodx.metrics import Metrics  # noqa: E402
+
+def make_router(**kwargs):
+    return ModelRouter("large", "small", "mood=small,agent=small", prices="", metrics=Metrics(), **kwargs)
+
+def test_short_replies_are_not_compared_with_long_ones():
+    router = make_router()
+    router.record("large", 8.3, {"completion_tokens": 2000}, call_type="recommendations")
+    router.record("small", 0.175, {"completion_tokens": 20}, call_type="mood")
+    assert router.candidates("mood") == ["small", "large"]
+    assert router.candidates("agent") == ["small", "large"]
+    assert router.candidates("recommendations") == ["large", "small"]
+
+def test_slow_tier_is_skipped_and_probed():
+    router = make_router(probe_every=5)
+    router.record("small", 2.0, {"completion_tokens": 20}, call_type="mood")
+    router.record("large", 0.2, {"completion_tokens": 20}, call_type="mood")
+    picks = [router.candidates("mood")[0] for _ in range(10)]
+    assert picks.count("small") == 2
+    assert picks[4] == picks[9] == "small"